@@ -16,7 +16,7 @@ from modules.mcq_generator import (
 )
 from modules.pdf_translator import translate_pdf_with_pdf2zh, create_docx_from_pdf
 from modules.common import create_docx
-from modules.database_service import db_service
+from modules.database_service import get_db_service
 
 # Check API key
 if not GEMINI_API_KEY:
@@ -78,7 +78,7 @@ with tab1:
             st.session_state["translated_pdf_lang"] = translate_language
             
             # Store in MongoDB
-            if db_service.is_connected():
+            if get_db_service().is_connected():
                 try:
                     # Read file data
                     translator_file.seek(0)
@@ -99,7 +99,7 @@ with tab1:
                             dual_data = f.read()
                     
                     # Store in database
-                    job_id = db_service.store_translation(
+                    translation_doc = get_db_service().store_translation(
                         input_file_data=input_data,
                         input_filename=translator_file.name,
                         language=translate_language,
@@ -108,7 +108,8 @@ with tab1:
                         metadata={"lang_code": result.get("lang_code")}
                     )
                     
-                    if job_id:
+                    if translation_doc:
+                        job_id = str(translation_doc["_id"])
                         st.session_state["translation_job_id"] = job_id
                         st.info(f"💾 Stored in database. Job ID: {job_id}")
                 except Exception as db_exc:
@@ -165,7 +166,7 @@ with tab2:
             st.session_state["solution_result"] = result
             
             # Store in MongoDB
-            if db_service.is_connected():
+            if get_db_service().is_connected():
                 try:
                     # Read file data
                     solution_file.seek(0)
@@ -179,7 +180,7 @@ with tab2:
                             docx_data = f.read()
                     
                     # Store in database
-                    job_id = db_service.store_solution(
+                    job_id = get_db_service().store_solution(
                         input_file_data=input_data,
                         input_filename=solution_file.name,
                         language=solution_language,
@@ -189,7 +190,7 @@ with tab2:
                     )
                     
                     if job_id:
-                        st.session_state["solution_job_id"] = job_id
+                        st.session_state["solution_job_id"] = str(job_id)
                         st.info(f"💾 Stored in database. Job ID: {job_id}")
                 except Exception as db_exc:
                     st.warning(f"⚠️ Could not store in database: {db_exc}")
@@ -330,9 +331,9 @@ with tab3:
         docx_bytes = create_docx("\n".join(docx_content), f"MCQs - {topic_name} ({current_lang})")
         if docx_bytes:
             # Store in MongoDB
-            if db_service.is_connected() and "mcq_job_id" not in st.session_state:
+            if get_db_service().is_connected() and "mcq_job_id" not in st.session_state:
                 try:
-                    job_id = db_service.store_mcq(
+                    job_id = get_db_service().store_mcq(
                         topic=topic_name,
                         language=current_lang,
                         num_questions=len(mcqs),
@@ -342,7 +343,7 @@ with tab3:
                     )
                     
                     if job_id:
-                        st.session_state["mcq_job_id"] = job_id
+                        st.session_state["mcq_job_id"] = str(job_id)
                         st.info(f"💾 Stored in database. Job ID: {job_id}")
                 except Exception as db_exc:
                     st.warning(f"⚠️ Could not store in database: {db_exc}")
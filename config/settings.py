@@ -17,9 +17,20 @@ GEMINI_MODEL_NAME = (
     os.getenv("GENAI_MODEL") or os.getenv("GEMINI_MODEL") or "models/gemini-2.0-flash"
 )
 
-# Initialize Gemini (will be configured in app.py)
+# SDK transport; "grpc" keeps one persistent HTTP/2 channel that all calls
+# (including concurrent translation batches) multiplex over
+GEMINI_TRANSPORT = os.getenv("GEMINI_TRANSPORT", "grpc")
+
+# Seconds before a single Gemini request is abandoned (and retried by the caller's fallback)
+GEMINI_REQUEST_TIMEOUT = float(os.getenv("GEMINI_REQUEST_TIMEOUT", "120"))
+
+# Client-side request/token budget per minute shared by all Gemini calls (0 disables)
+GEMINI_RPM = int(os.getenv("GEMINI_RPM", "60"))
+GEMINI_TPM = int(os.getenv("GEMINI_TPM", "1000000"))
+
+# Initialize Gemini once; every caller shares this model and its channel
 if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
+    genai.configure(api_key=GEMINI_API_KEY, transport=GEMINI_TRANSPORT)
     model = genai.GenerativeModel(GEMINI_MODEL_NAME)
 else:
     model = None
@@ -48,6 +59,20 @@ SOLUTION_JOBS_ROOT.mkdir(parents=True, exist_ok=True)
 PDF2ZH_JOBS_ROOT = Path("pdf2zh_jobs")
 PDF2ZH_JOBS_ROOT.mkdir(parents=True, exist_ok=True)
 
+# Hours to keep PDF translation job directories before startup cleanup removes them
+PDF2ZH_JOB_MAX_AGE_HOURS = float(os.getenv("PDF2ZH_JOB_MAX_AGE_HOURS", "24"))
+
+# Persistent cache of (text, language) -> translation
+TRANSLATION_CACHE_PATH = PDF2ZH_JOBS_ROOT / "trcache.sqlite3"
+
+# Persistent cache of Gemini responses keyed by prompt
+LLM_CACHE_PATH = SOLUTION_JOBS_ROOT / "llm_cache.sqlite3"
+# "readwrite" (default), "readonly" (serve hits, store nothing) or "off"
+LLM_CACHE_MODE = os.getenv("LLM_CACHE_MODE", "readwrite").strip().lower()
+
+# Learned items-per-batch for solution translation, per language
+TRANSLATE_BATCH_SIZES_PATH = SOLUTION_JOBS_ROOT / "translate_batch_sizes.json"
+
 # Language-specific labels for solutions
 PIPELINE_LABELS = {
     "telugu": ("సమాధానం", "వివరణ", "తెలుగులో అనువదించిన ప్రశ్నపత్రం"),
@@ -60,6 +85,11 @@ PIPELINE_LABELS = {
 # MongoDB Configuration
 MONGODB_URI = os.getenv("MONGODB_URI") or os.getenv("MONGO_URI")
 MONGODB_DB_NAME = os.getenv("MONGODB_DB_NAME", "pdf_translation_db")
+# Days to keep translation/solution/MCQ metadata and their fs.files entries before
+# MongoDB's TTL monitor purges them (0, the default, keeps everything)
+MONGODB_RETENTION_DAYS = int(os.getenv("MONGODB_RETENTION_DAYS", "0"))
+# Marker file recording that indexes were already ensured (skips createIndex on restart)
+MONGODB_INDEX_MARKER = Path(os.getenv("MONGODB_INDEX_MARKER", ".mongodb_indexes"))
 
 
 def get_mongodb_connection() -> Tuple[Optional[object], Optional[object]]:
@@ -5,6 +5,7 @@ import html
 import io
 import json
 import re
+import threading
 import time
 from pathlib import Path
 
@@ -13,10 +14,62 @@ from docx import Document
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.shared import RGBColor
 
-from config.settings import model
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
 
+from config.settings import GEMINI_REQUEST_TIMEOUT, GEMINI_RPM, GEMINI_TPM, model
+from modules import llm_cache
 
-def _call_generative_model(prompt: str, max_attempts: int = 3, cooldown_seconds: float = 45.0):
+# Markdown-fenced and bare JSON in model output
+_JSON_FENCE_RE = re.compile(r"```json\s*(.*?)```", re.DOTALL | re.IGNORECASE)
+_ANY_FENCE_RE = re.compile(r"```\s*(.*?)```", re.DOTALL)
+_JSON_OBJECT_ARRAY_RE = re.compile(r"\[\s*\{.*?\}\s*\]", re.DOTALL)
+# Server-suggested backoff in quota errors ("retry in 12.5s")
+_RETRY_DELAY_RE = re.compile(r"retry in ([\d.]+)s")
+
+
+class _TokenBucket:
+    """Thread-safe per-minute request and token budget, refilled continuously."""
+
+    def __init__(self, rpm: int, tpm: int):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: int = 0) -> None:
+        """Block until one more request of about `tokens` tokens fits the budget."""
+        tokens = min(tokens, self.tpm)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                elapsed = now - self._updated
+                self._updated = now
+                self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+                self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+                wait = 0.0
+                if self.rpm > 0 and self._requests < 1:
+                    wait = (1 - self._requests) * 60 / self.rpm
+                if self.tpm > 0 and self._tokens < tokens:
+                    wait = max(wait, (tokens - self._tokens) * 60 / self.tpm)
+                if wait <= 0:
+                    self._requests -= 1
+                    self._tokens -= tokens
+                    return
+            time.sleep(wait)
+
+
+# Shared by every caller so concurrent batches stay under the provider quota
+_rate_limiter = _TokenBucket(GEMINI_RPM, GEMINI_TPM)
+
+
+def _call_generative_model(
+    prompt: str, max_attempts: int = 3, cooldown_seconds: float = 45.0, generation_config: dict | None = None
+):
     """
     Wrapper around Gemini calls with basic retry/backoff on quota errors.
     """
@@ -25,10 +78,14 @@ def _call_generative_model(prompt: str, max_attempts: int = 3, cooldown_seconds:
     
     last_error: Exception | None = None
     for attempt in range(1, max_attempts + 1):
+        # Wait for budget up front instead of hitting 429s and backing off
+        _rate_limiter.acquire(len(prompt) // 4)
         try:
-            response = model.generate_content(prompt)
-            time.sleep(1.0)  # keep requests under per-minute free-tier limits
-            return response
+            return model.generate_content(
+                prompt,
+                generation_config=generation_config,
+                request_options={"timeout": GEMINI_REQUEST_TIMEOUT},
+            )
         except Exception as exc:
             last_error = exc
             message = str(exc).lower()
@@ -39,7 +96,7 @@ def _call_generative_model(prompt: str, max_attempts: int = 3, cooldown_seconds:
                 # Extract retry delay if available
                 retry_delay = 60  # default
                 if "retry in" in error_msg.lower():
-                    delay_match = re.search(r"retry in ([\d.]+)s", error_msg.lower())
+                    delay_match = _RETRY_DELAY_RE.search(error_msg.lower())
                     if delay_match:
                         retry_delay = int(float(delay_match.group(1))) + 5
                 
@@ -52,6 +109,14 @@ def _call_generative_model(prompt: str, max_attempts: int = 3, cooldown_seconds:
                     raise RuntimeError(
                         f"API request failed after {max_attempts} attempts. Please try again later."
                     )
+
+            # Transient server/network errors (timeouts, 503s) get a short exponential backoff
+            if attempt < max_attempts and (
+                "deadline" in message or "timeout" in message or "timed out" in message
+                or "503" in message or "unavailable" in message
+            ):
+                time.sleep(2 ** attempt)
+                continue
             break
     
     # If we get here, it's not a quota error
@@ -60,17 +125,62 @@ def _call_generative_model(prompt: str, max_attempts: int = 3, cooldown_seconds:
     raise RuntimeError("Gemini call failed unexpectedly.")
 
 
+def _call_generative_model_cached(prompt: str, parse, ttl: float | None = None, **kwargs):
+    """Like _call_generative_model, but returns parse(response text) and serves
+    repeated prompts (newer than ttl seconds) from the LLM cache.
+
+    Only replies that parse are cached, and a cached reply that no longer parses
+    is requested again, so a truncated or garbled response is never replayed.
+    """
+    cached = llm_cache.get_response(prompt, ttl)
+    if cached is not None:
+        try:
+            return parse(cached)
+        except Exception:
+            pass
+    text = _call_generative_model(prompt, **kwargs).text
+    parsed = parse(text)
+    llm_cache.set_response(prompt, text)
+    return parsed
+
+
+def _json_loads(data):
+    """Parse JSON from str or bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj) -> str:
+    """Serialize to a compact JSON string without escaping non-ASCII text."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def _write_json_file(path: Path, obj):
+    """Write obj as indented UTF-8 JSON, serializing with orjson when available."""
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        return
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, indent=2)
+
+
 def extract_json_block(text: str) -> str:
     """Extract JSON block from text."""
     if not text:
         return ""
-    match = re.search(r"```json\s*(.*?)```", text, re.DOTALL | re.IGNORECASE)
-    if match:
-        return match.group(1).strip()
-    match = re.search(r"```\s*(.*?)```", text, re.DOTALL)
-    if match:
-        return match.group(1).strip()
-    match = re.search(r"\[\s*\{.*?\}\s*\]", text, re.DOTALL)
+    # Fence patterns can only match when a fence is present (usually not,
+    # since prompts ask for bare JSON), so skip both scans cheaply
+    if "```" in text:
+        match = _JSON_FENCE_RE.search(text)
+        if match:
+            return match.group(1).strip()
+        match = _ANY_FENCE_RE.search(text)
+        if match:
+            return match.group(1).strip()
+    match = _JSON_OBJECT_ARRAY_RE.search(text)
     if match:
         return match.group(0).strip()
     return text.strip()
@@ -78,17 +188,35 @@ def extract_json_block(text: str) -> str:
 
 def extract_inner_json(text: str):
     """Extract and parse JSON from text."""
-    if not text:
+    if not text or "```" not in text:
         return None
-    match = re.search(r"```json\s*(.*?)```", text, re.DOTALL | re.IGNORECASE)
+    match = _JSON_FENCE_RE.search(text)
     if not match:
         return None
     try:
-        return json.loads(match.group(1))
-    except json.JSONDecodeError:
+        return _json_loads(match.group(1))
+    except ValueError:
         return None
 
 
+def parse_json_response(text: str):
+    """Parse JSON from model output, trying the bare-JSON case before fence/regex extraction."""
+    stripped = (text or "").strip()
+    # Responses are bare or ```json-fenced JSON, so trimming to the outermost
+    # brackets usually parses in one call without any regex scan
+    starts = [index for index in (stripped.find("["), stripped.find("{")) if index >= 0]
+    end = max(stripped.rfind("]"), stripped.rfind("}")) + 1
+    if starts and end > min(starts):
+        try:
+            return _json_loads(stripped[min(starts) : end])
+        except ValueError:
+            pass
+    parsed = extract_inner_json(stripped)
+    if not parsed:
+        parsed = _json_loads(extract_json_block(stripped))
+    return parsed
+
+
 def _clean_text(value: str) -> str:
     """Clean HTML entities and whitespace from text."""
     if not value:
@@ -2,15 +2,49 @@
 MongoDB Database Service for PDF Translation Application
 Handles storing and retrieving metadata (no binary file storage)
 """
-from datetime import datetime
-from typing import Optional, Dict, Any, List
+import hashlib
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List, Union
 from bson.objectid import ObjectId
-from config.settings import get_mongodb_connection
+from pymongo.errors import BulkWriteError, OperationFailure
+from pymongo.write_concern import WriteConcern
+from config.settings import (
+    get_mongodb_connection,
+    MONGODB_DB_NAME,
+    MONGODB_INDEX_MARKER,
+    MONGODB_RETENTION_DAYS,
+)
+
+# IndexOptionsConflict / IndexKeySpecsConflict: an index on the same keys
+# already exists with different options
+_INDEX_CONFLICT_CODES = (85, 86)
+
+
+def _as_object_id(value: Union[str, ObjectId]) -> ObjectId:
+    """Return value as an ObjectId, parsing it only when given a string"""
+    return value if isinstance(value, ObjectId) else ObjectId(value)
+
+
+# Job document fields referencing fs.files docs; stored as ObjectIds, returned as strings
+_FILE_REF_FIELDS = ("input_file_id", "mono_pdf_id", "dual_pdf_id", "docx_file_id")
+
+
+def _stringify_ids(doc: Dict, include_id: bool = True) -> Dict:
+    """Convert a job document's _id and fs.files references to strings, in place"""
+    fields = ("_id",) + _FILE_REF_FIELDS if include_id else _FILE_REF_FIELDS
+    for field in fields:
+        if isinstance(doc.get(field), ObjectId):
+            doc[field] = str(doc[field])
+    return doc
 
 
 class DatabaseService:
     """Service class for MongoDB operations"""
     
+    # Bump whenever the index set in _create_indexes changes so the
+    # on-disk marker is invalidated and the new indexes get created.
+    _INDEX_VERSION = 6
+    
     def __init__(self):
         """Initialize database connection (fs.files metadata, no fs.chunks)"""
         self.client, self.db = get_mongodb_connection()
@@ -20,24 +54,105 @@ class DatabaseService:
             self.translations_collection = self.db['translations']
             self.solutions_collection = self.db['solutions']
             self.mcqs_collection = self.db['mcqs']
-            # fs.files collection for file metadata (no fs.chunks)
-            self.fs_files_collection = self.db['fs.files']
-            self._create_indexes()
+            # fs.files collection for file metadata (no fs.chunks). These docs are
+            # non-authoritative, so skip waiting for the journal on writes.
+            self.fs_files_collection = self.db.get_collection(
+                'fs.files', write_concern=WriteConcern(w=1, j=False)
+            )
+            self._indexes_ensured = self._index_marker_matches()
+            if not self._indexes_ensured:
+                self._create_indexes()
+    
+    def _index_marker_value(self) -> str:
+        """Marker content identifying the database and index set"""
+        return f"{MONGODB_DB_NAME}:{self._INDEX_VERSION}:{MONGODB_RETENTION_DAYS}"
+    
+    def _index_marker_matches(self) -> bool:
+        """Check whether a previous process already ensured the current indexes"""
+        try:
+            return MONGODB_INDEX_MARKER.read_text(encoding="utf-8").strip() == self._index_marker_value()
+        except OSError:
+            return False
+    
+    def _create_language_index(self):
+        """Index translations by language for list_translations' filtered sort"""
+        # Covers every language, since jobs are spread across the target
+        # languages; replaces the partial index earlier versions created
+        self._ensure_index(
+            self.translations_collection,
+            [("language", 1), ("created_at", -1)],
+            background=True
+        )
     
     def _create_indexes(self):
         """Create database indexes for better performance"""
-        try:
-            # Create indexes for faster queries
-            self.translations_collection.create_index([("created_at", -1)])
-            self.translations_collection.create_index([("language", 1)])
-            self.solutions_collection.create_index([("created_at", -1)])
-            self.mcqs_collection.create_index([("topic", 1)])
-            self.mcqs_collection.create_index([("created_at", -1)])
+        # Each index is created on its own so one failure doesn't skip the rest
+        index_steps = [
+            ("translations.created_at", lambda: self._create_date_index(self.translations_collection, "created_at")),
+            ("translations.language", self._create_language_index),
+            ("solutions.created_at", lambda: self._create_date_index(self.solutions_collection, "created_at")),
+            ("mcqs.topic", lambda: self.mcqs_collection.create_index([("topic", 1)])),
+            ("mcqs.created_at", lambda: self._create_date_index(self.mcqs_collection, "created_at")),
             # Indexes for fs.files (GridFS-like metadata)
-            self.fs_files_collection.create_index([("filename", 1)])
-            self.fs_files_collection.create_index([("uploadDate", -1)])
-        except Exception as e:
-            print(f"Warning: Could not create indexes: {e}")
+            ("fs.files.filename", lambda: self.fs_files_collection.create_index([("filename", 1)])),
+            # File metadata expires with the job documents it was stored alongside
+            ("fs.files.uploadDate", lambda: self._create_date_index(self.fs_files_collection, "uploadDate")),
+        ]
+        failed = False
+        for label, create in index_steps:
+            try:
+                create()
+            except Exception as e:
+                print(f"Warning: Could not create index {label}: {e}")
+                failed = True
+        if failed:
+            # Leave the marker unwritten so the next start retries
+            return
+        
+        self._indexes_ensured = True
+        try:
+            MONGODB_INDEX_MARKER.write_text(self._index_marker_value(), encoding="utf-8")
+        except OSError as e:
+            print(f"Warning: Could not write index marker: {e}")
+    
+    @staticmethod
+    def _ensure_index(collection, keys, **options):
+        """create_index that replaces an existing index on the same keys with other options"""
+        try:
+            collection.create_index(keys, **options)
+            return
+        except OperationFailure as e:
+            if e.code not in _INDEX_CONFLICT_CODES:
+                raise
+        if "expireAfterSeconds" in options:
+            try:
+                # A changed retention period is updated in place, without a rebuild
+                collection.database.command(
+                    "collMod",
+                    collection.name,
+                    index={"keyPattern": dict(keys), "expireAfterSeconds": options["expireAfterSeconds"]}
+                )
+                return
+            except OperationFailure:
+                pass
+        collection.drop_index(keys)
+        collection.create_index(keys, **options)
+    
+    @classmethod
+    def _create_date_index(cls, collection, field: str):
+        """Index a date field, as a TTL index when a retention period is configured"""
+        if MONGODB_RETENTION_DAYS > 0:
+            keys, stale = [(field, 1)], f"{field}_-1"
+            options = {"expireAfterSeconds": MONGODB_RETENTION_DAYS * 24 * 3600, "background": True}
+        else:
+            # A TTL index left from an earlier retention setting would keep deleting documents
+            keys, stale = [(field, -1)], f"{field}_1"
+            options = {}
+        # Either direction serves the date-descending sorts used by the
+        # list_*/find_* methods, so the index for the other setting is dropped
+        if stale in collection.index_information():
+            collection.drop_index(stale)
+        cls._ensure_index(collection, keys, **options)
     
     def is_connected(self) -> bool:
         """Check if MongoDB is connected"""
@@ -45,12 +160,44 @@ class DatabaseService:
     
     # ==== FILE METADATA OPERATIONS (fs.files format, no chunks) ====
     
+    @staticmethod
+    def _build_file_doc(
+        file_data: bytes,
+        filename: str,
+        content_type: str,
+        metadata: Optional[Dict] = None,
+        upload_date: Optional[datetime] = None
+    ) -> Dict:
+        """Build an fs.files document with a client-side _id (data is NOT stored)"""
+        # Calculate file properties (but don't store the data)
+        if not file_data:
+            file_length, md5_hash = 0, ""
+        else:
+            file_length = len(file_data)
+            md5_hash = hashlib.md5(file_data).hexdigest()
+        if upload_date is None:
+            upload_date = datetime.now(timezone.utc)
+        
+        # Create fs.files document (GridFS metadata format)
+        return {
+            "_id": ObjectId(),
+            "filename": filename,
+            "length": file_length,
+            "chunkSize": 255 * 1024,  # Standard GridFS chunk size
+            "uploadDate": upload_date,
+            "md5": md5_hash,
+            "contentType": content_type,
+            "metadata": metadata or {}
+            # No "_no_chunks" flag: this service never writes fs.chunks
+        }
+    
     def store_file_metadata(
         self,
         file_data: bytes,
         filename: str,
         content_type: str = "application/octet-stream",
-        metadata: Optional[Dict] = None
+        metadata: Optional[Dict] = None,
+        upload_date: Optional[datetime] = None
     ) -> Optional[ObjectId]:
         """
         Store file metadata in fs.files format (NO binary chunks stored)
@@ -60,6 +207,7 @@ class DatabaseService:
             filename: File name
             content_type: MIME type
             metadata: Additional metadata
+            upload_date: Upload timestamp (defaults to now, in UTC)
             
         Returns:
             File ID (ObjectId) if successful, None otherwise
@@ -68,27 +216,9 @@ class DatabaseService:
             return None
         
         try:
-            import hashlib
-            
-            # Calculate file properties (but don't store the data)
-            file_length = len(file_data)
-            md5_hash = hashlib.md5(file_data).hexdigest() if file_data else ""
-            upload_date = datetime.utcnow()
-            
-            # Create fs.files document (GridFS metadata format)
-            file_doc = {
-                "_id": ObjectId(),
-                "filename": filename,
-                "length": file_length,
-                "chunkSize": 255 * 1024,  # Standard GridFS chunk size
-                "uploadDate": upload_date,
-                "md5": md5_hash,
-                "contentType": content_type,
-                "metadata": metadata or {},
-                # Custom flag to indicate no chunks stored
-                "_no_chunks": True
-            }
-            
+            file_doc = self._build_file_doc(
+                file_data, filename, content_type, metadata, upload_date
+            )
             result = self.fs_files_collection.insert_one(file_doc)
             return result.inserted_id
         
@@ -96,13 +226,13 @@ class DatabaseService:
             print(f"Error storing file metadata: {e}")
             return None
     
-    def get_file_metadata(self, file_id: ObjectId) -> Optional[Dict]:
+    def get_file_metadata(self, file_id: Union[str, ObjectId]) -> Optional[Dict]:
         """Get file metadata from fs.files collection"""
         if not self.is_connected():
             return None
         
         try:
-            doc = self.fs_files_collection.find_one({"_id": file_id})
+            doc = self.fs_files_collection.find_one({"_id": _as_object_id(file_id)})
             if doc:
                 doc['_id'] = str(doc['_id'])
             return doc
@@ -136,7 +266,7 @@ class DatabaseService:
         mono_pdf_data: Optional[bytes] = None,
         dual_pdf_data: Optional[bytes] = None,
         metadata: Optional[Dict] = None
-    ) -> Optional[str]:
+    ) -> Optional[Dict]:
         """
         Store a PDF translation job metadata (no binary storage)
         
@@ -149,72 +279,113 @@ class DatabaseService:
             metadata: Additional metadata
             
         Returns:
-            Translation job ID if successful, None otherwise
+            The stored translation document (with its ObjectId under "_id" and
+            the file references as strings) if
+            successful, None otherwise. Callers can use it directly instead of
+            reading it back with get_translation().
         """
         if not self.is_connected():
             return None
         
         try:
-            # Store file metadata in fs.files (no chunks)
+            now = datetime.now(timezone.utc)
+            input_file_size = len(input_file_data) if input_file_data else 0
+            mono_pdf_size = len(mono_pdf_data) if mono_pdf_data else 0
+            dual_pdf_size = len(dual_pdf_data) if dual_pdf_data else 0
+            
+            # Build file metadata docs with pre-assigned IDs and store them
+            # in fs.files (no chunks) with a single insert_many round-trip
             input_file_id = None
             mono_file_id = None
             dual_file_id = None
+            files_to_insert = []
             
             if input_file_data:
-                input_file_id = self.store_file_metadata(
-                    file_data=input_file_data,
-                    filename=input_filename,
-                    content_type="application/pdf",
-                    metadata={"type": "input", "language": language}
+                input_doc = self._build_file_doc(
+                    input_file_data,
+                    input_filename,
+                    "application/pdf",
+                    {"type": "input", "language": language},
+                    now
                 )
+                input_file_id = input_doc["_id"]
+                files_to_insert.append(input_doc)
             
             if mono_pdf_data:
-                mono_file_id = self.store_file_metadata(
-                    file_data=mono_pdf_data,
-                    filename=f"mono_{input_filename}",
-                    content_type="application/pdf",
-                    metadata={"type": "mono_pdf", "language": language}
+                mono_doc = self._build_file_doc(
+                    mono_pdf_data,
+                    f"mono_{input_filename}",
+                    "application/pdf",
+                    {"type": "mono_pdf", "language": language},
+                    now
                 )
+                mono_file_id = mono_doc["_id"]
+                files_to_insert.append(mono_doc)
             
             if dual_pdf_data:
-                dual_file_id = self.store_file_metadata(
-                    file_data=dual_pdf_data,
-                    filename=f"dual_{input_filename}",
-                    content_type="application/pdf",
-                    metadata={"type": "dual_pdf", "language": language}
+                dual_doc = self._build_file_doc(
+                    dual_pdf_data,
+                    f"dual_{input_filename}",
+                    "application/pdf",
+                    {"type": "dual_pdf", "language": language},
+                    now
                 )
+                dual_file_id = dual_doc["_id"]
+                files_to_insert.append(dual_doc)
+            
+            if files_to_insert:
+                try:
+                    self.fs_files_collection.insert_many(
+                        files_to_insert, ordered=False, bypass_document_validation=True
+                    )
+                except BulkWriteError as e:
+                    # Unordered inserts write every doc they can; only drop the
+                    # references to the ones that failed
+                    print(f"Error storing file metadata: {e}")
+                    failed_ids = {
+                        files_to_insert[error["index"]]["_id"]
+                        for error in e.details.get("writeErrors", [])
+                    }
+                    input_file_id, mono_file_id, dual_file_id = (
+                        None if file_id in failed_ids else file_id
+                        for file_id in (input_file_id, mono_file_id, dual_file_id)
+                    )
+                except Exception as e:
+                    print(f"Error storing file metadata: {e}")
+                    input_file_id = mono_file_id = dual_file_id = None
             
             # Create translation document with file IDs
             translation_doc = {
-                "input_file_id": str(input_file_id) if input_file_id else None,
+                "_id": ObjectId(),
+                "input_file_id": input_file_id,
                 "input_filename": input_filename,
-                "input_file_size": len(input_file_data) if input_file_data else 0,
+                "input_file_size": input_file_size,
                 "language": language,
-                "mono_pdf_id": str(mono_file_id) if mono_file_id else None,
-                "mono_pdf_size": len(mono_pdf_data) if mono_pdf_data else 0,
-                "dual_pdf_id": str(dual_file_id) if dual_file_id else None,
-                "dual_pdf_size": len(dual_pdf_data) if dual_pdf_data else 0,
-                "created_at": datetime.utcnow(),
+                "mono_pdf_id": mono_file_id,
+                "mono_pdf_size": mono_pdf_size,
+                "dual_pdf_id": dual_file_id,
+                "dual_pdf_size": dual_pdf_size,
+                "created_at": now,
                 "status": "completed" if mono_pdf_data or dual_pdf_data else "pending",
                 "metadata": metadata or {}
             }
             
-            result = self.translations_collection.insert_one(translation_doc)
-            return str(result.inserted_id)
+            self.translations_collection.insert_one(translation_doc)
+            return _stringify_ids(translation_doc, include_id=False)
         
         except Exception as e:
             print(f"Error storing translation: {e}")
             return None
     
-    def get_translation(self, translation_id: str) -> Optional[Dict]:
+    def get_translation(self, translation_id: Union[str, ObjectId]) -> Optional[Dict]:
         """Get translation details by ID"""
         if not self.is_connected():
             return None
         
         try:
-            doc = self.translations_collection.find_one({"_id": ObjectId(translation_id)})
+            doc = self.translations_collection.find_one({"_id": _as_object_id(translation_id)})
             if doc:
-                doc['_id'] = str(doc['_id'])
+                _stringify_ids(doc)
             return doc
         except Exception as e:
             print(f"Error retrieving translation: {e}")
@@ -234,7 +405,7 @@ class DatabaseService:
             cursor = self.translations_collection.find(query).sort("created_at", -1).limit(limit)
             results = []
             for doc in cursor:
-                doc['_id'] = str(doc['_id'])
+                _stringify_ids(doc)
                 results.append(doc)
             return results
         except Exception as e:
@@ -251,7 +422,7 @@ class DatabaseService:
         docx_data: Optional[bytes] = None,
         json_data: Optional[Dict] = None,
         metadata: Optional[Dict] = None
-    ) -> Optional[str]:
+    ) -> Optional[ObjectId]:
         """
         Store a solution generation job metadata (no binary storage)
         
@@ -264,12 +435,16 @@ class DatabaseService:
             metadata: Additional metadata
             
         Returns:
-            Solution job ID if successful, None otherwise
+            Solution job ID (ObjectId) if successful, None otherwise
         """
         if not self.is_connected():
             return None
         
         try:
+            now = datetime.now(timezone.utc)
+            input_file_size = len(input_file_data) if input_file_data else 0
+            docx_size = len(docx_data) if docx_data else 0
+            
             # Store file metadata in fs.files (no chunks)
             input_file_id = None
             docx_file_id = None
@@ -279,7 +454,8 @@ class DatabaseService:
                     file_data=input_file_data,
                 filename=input_filename,
                     content_type="application/pdf",
-                    metadata={"type": "input", "language": language}
+                    metadata={"type": "input", "language": language},
+                    upload_date=now
             )
             
             if docx_data:
@@ -287,40 +463,41 @@ class DatabaseService:
                     file_data=docx_data,
                     filename=f"solution_{input_filename.replace('.pdf', '.docx')}",
                     content_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                    metadata={"type": "solution_docx", "language": language}
+                    metadata={"type": "solution_docx", "language": language},
+                    upload_date=now
                 )
             
             # Create solution document with file IDs
             solution_doc = {
-                "input_file_id": str(input_file_id) if input_file_id else None,
+                "input_file_id": input_file_id,
                 "input_filename": input_filename,
-                "input_file_size": len(input_file_data) if input_file_data else 0,
+                "input_file_size": input_file_size,
                 "language": language,
-                "docx_file_id": str(docx_file_id) if docx_file_id else None,
+                "docx_file_id": docx_file_id,
                 "has_docx": docx_data is not None,
-                "docx_size": len(docx_data) if docx_data else 0,
+                "docx_size": docx_size,
                 "json_data": json_data,
-                "created_at": datetime.utcnow(),
+                "created_at": now,
                 "status": "completed" if docx_data else "pending",
                 "metadata": metadata or {}
             }
             
             result = self.solutions_collection.insert_one(solution_doc)
-            return str(result.inserted_id)
+            return result.inserted_id
         
         except Exception as e:
             print(f"Error storing solution: {e}")
             return None
     
-    def get_solution(self, solution_id: str) -> Optional[Dict]:
+    def get_solution(self, solution_id: Union[str, ObjectId]) -> Optional[Dict]:
         """Get solution details by ID"""
         if not self.is_connected():
             return None
         
         try:
-            doc = self.solutions_collection.find_one({"_id": ObjectId(solution_id)})
+            doc = self.solutions_collection.find_one({"_id": _as_object_id(solution_id)})
             if doc:
-                doc['_id'] = str(doc['_id'])
+                _stringify_ids(doc)
             return doc
         except Exception as e:
             print(f"Error retrieving solution: {e}")
@@ -339,7 +516,7 @@ class DatabaseService:
             cursor = self.solutions_collection.find(query).sort("created_at", -1).limit(limit)
             results = []
             for doc in cursor:
-                doc['_id'] = str(doc['_id'])
+                _stringify_ids(doc)
                 results.append(doc)
             return results
         except Exception as e:
@@ -356,7 +533,7 @@ class DatabaseService:
         mcq_data: List[Dict],
         docx_data: Optional[bytes] = None,
         metadata: Optional[Dict] = None
-    ) -> Optional[str]:
+    ) -> Optional[ObjectId]:
         """
         Store an MCQ generation job metadata (no binary storage)
         
@@ -369,12 +546,14 @@ class DatabaseService:
             metadata: Additional metadata
             
         Returns:
-            MCQ job ID if successful, None otherwise
+            MCQ job ID (ObjectId) if successful, None otherwise
         """
         if not self.is_connected():
             return None
         
         try:
+            now = datetime.now(timezone.utc)
+            
             # Store file metadata in fs.files (no chunks)
             docx_file_id = None
             
@@ -383,7 +562,8 @@ class DatabaseService:
                     file_data=docx_data,
                     filename=f"mcq_{topic.replace(' ', '_')}_{language}.docx",
                     content_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-                    metadata={"type": "mcq_docx", "topic": topic, "language": language}
+                    metadata={"type": "mcq_docx", "topic": topic, "language": language},
+                    upload_date=now
                 )
             
             # Create MCQ document with file ID
@@ -392,30 +572,30 @@ class DatabaseService:
                 "language": language,
                 "num_questions": num_questions,
                 "mcq_data": mcq_data,
-                "docx_file_id": str(docx_file_id) if docx_file_id else None,
+                "docx_file_id": docx_file_id,
                 "has_docx": docx_data is not None,
                 "docx_size": len(docx_data) if docx_data else 0,
-                "created_at": datetime.utcnow(),
+                "created_at": now,
                 "status": "completed",
                 "metadata": metadata or {}
             }
             
             result = self.mcqs_collection.insert_one(mcq_doc)
-            return str(result.inserted_id)
+            return result.inserted_id
         
         except Exception as e:
             print(f"Error storing MCQ: {e}")
             return None
     
-    def get_mcq(self, mcq_id: str) -> Optional[Dict]:
+    def get_mcq(self, mcq_id: Union[str, ObjectId]) -> Optional[Dict]:
         """Get MCQ details by ID"""
         if not self.is_connected():
             return None
         
         try:
-            doc = self.mcqs_collection.find_one({"_id": ObjectId(mcq_id)})
+            doc = self.mcqs_collection.find_one({"_id": _as_object_id(mcq_id)})
             if doc:
-                doc['_id'] = str(doc['_id'])
+                _stringify_ids(doc)
             return doc
         except Exception as e:
             print(f"Error retrieving MCQ: {e}")
@@ -434,7 +614,7 @@ class DatabaseService:
             cursor = self.mcqs_collection.find(query).sort("created_at", -1).limit(limit)
             results = []
             for doc in cursor:
-                doc['_id'] = str(doc['_id'])
+                _stringify_ids(doc)
                 results.append(doc)
             return results
         except Exception as e:
@@ -461,5 +641,13 @@ class DatabaseService:
             return {"error": str(e)}
 
 
-# Create a singleton instance
-db_service = DatabaseService()
+# Lazily created singleton instance (avoids connecting to MongoDB at import time)
+_db_service: Optional[DatabaseService] = None
+
+
+def get_db_service() -> DatabaseService:
+    """Return the shared DatabaseService, creating it on first use"""
+    global _db_service
+    if _db_service is None:
+        _db_service = DatabaseService()
+    return _db_service
@@ -0,0 +1,93 @@
+"""
+LLM Cache Module - Persistent prompt -> Gemini response store
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from config.settings import GEMINI_MODEL_NAME, LLM_CACHE_MODE, LLM_CACHE_PATH
+
+# Hottest entries kept in-process in front of the SQLite store
+MEMORY_CACHE_SIZE = 2048
+
+_lock = threading.Lock()
+_memory = OrderedDict()
+_connection: sqlite3.Connection | None = None
+
+
+def _get_connection() -> sqlite3.Connection:
+    """Open the SQLite store on first use."""
+    global _connection
+    if _connection is None:
+        _connection = sqlite3.connect(str(LLM_CACHE_PATH), check_same_thread=False)
+        _connection.execute("PRAGMA journal_mode=WAL")
+        _connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+    return _connection
+
+
+def _make_key(prompt: str) -> str:
+    """Build the cache key for a prompt, ignoring whitespace-only differences."""
+    normalized = " ".join(prompt.split())
+    return hashlib.sha256(f"{GEMINI_MODEL_NAME}\0{normalized}".encode("utf-8")).hexdigest()
+
+
+def _remember(key: str, value: str, created_at: float):
+    """Store value in the in-process LRU (caller holds the lock)."""
+    _memory[key] = (value, created_at)
+    _memory.move_to_end(key)
+    if len(_memory) > MEMORY_CACHE_SIZE:
+        _memory.popitem(last=False)
+
+
+def get_response(prompt: str, ttl: float | None = None) -> str | None:
+    """Return the cached response text for prompt, or None on a miss.
+
+    With ttl (seconds), entries older than that count as misses; deterministic
+    prompts such as solves leave it unset and never expire.
+    """
+    if LLM_CACHE_MODE == "off":
+        return None
+    key = _make_key(prompt)
+    with _lock:
+        entry = _memory.get(key)
+        if entry is not None:
+            _memory.move_to_end(key)
+        else:
+            try:
+                row = _get_connection().execute(
+                    "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error:
+                return None
+            if row is None:
+                return None
+            entry = (row[0], row[1])
+            _remember(key, *entry)
+    value, created_at = entry
+    if ttl is not None and time.time() - created_at > ttl:
+        return None
+    return value
+
+
+def set_response(prompt: str, response_text: str):
+    """Cache the response text for prompt."""
+    if not response_text or LLM_CACHE_MODE in ("readonly", "off"):
+        return
+    key = _make_key(prompt)
+    created_at = time.time()
+    with _lock:
+        _remember(key, response_text, created_at)
+        try:
+            connection = _get_connection()
+            connection.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created_at) VALUES (?, ?, ?)",
+                (key, response_text, created_at),
+            )
+            connection.commit()
+        except sqlite3.Error:
+            pass  # the cache is best-effort
@@ -1,80 +1,238 @@
 """
 MCQ Generator Module - Generate and translate multiple-choice questions
 """
-import json
+import asyncio
+import re
 
 import streamlit as st
 
-from modules.common import _call_generative_model, create_docx
+try:
+    from langdetect import DetectorFactory, detect
+    from langdetect.lang_detect_exception import LangDetectException
 
+    DetectorFactory.seed = 0  # deterministic results across calls
+    LANGDETECT_AVAILABLE = True
+except ImportError:
+    LANGDETECT_AVAILABLE = False
 
-def generate_mcqs(topic, num_questions=5, language="English"):
-    """Generate MCQs on a given topic in the specified language."""
-    if language == "English":
-        prompt = f"""
-Generate {num_questions} high-quality MCQs on "{topic}".
+from config.settings import LANGUAGES
+from modules import translation_cache
+from modules.common import _call_generative_model, _json_dumps, _json_loads, create_docx
+
+# Strings sent per batched translation call
+TRANSLATE_BATCH_SIZE = 20
+# Characters that matter when scanning for a balanced JSON array
+_JSON_TOKEN_RE = re.compile(r'[\[\]"\\]')
+# Pure numbers/punctuation/symbols read the same in every language
+_SKIP_RE = re.compile(r"^[\s\d\W_]+$")
+# Placeholders left as-is in every language
+_SKIP_STRINGS = frozenset({"N/A", "n/a", "NA"})
+# Batched translation calls allowed in flight at once (keeps under Gemini RPM)
+MAX_CONCURRENT_TRANSLATIONS = 8
+# Shorter strings are too unreliable for language detection
+LANGDETECT_MIN_WORDS = 3
+# Option labels for list-style options
+_LETTERS = ("A", "B", "C", "D", "E", "F", "G", "H", "I", "J")
+
+_MCQ_PROMPT_EN = """
+Generate {n} high-quality MCQs on "{topic}".
 Return JSON array with fields question, options, correct_answer, explanation.
 Language: English.
 """
-    else:
-        prompt = f"""
-Generate {num_questions} high-quality MCQs on "{topic}" in {language} language.
+_MCQ_PROMPT_LOCALIZED = """
+Generate {n} high-quality MCQs on "{topic}" in {lang} language.
 Return JSON array with fields question, options, correct_answer, explanation.
-All content must be in {language} language.
+All content must be in {lang} language.
+"""
+# translate_text prompt split around the text, which may itself contain braces
+_TRANSLATE_PREFIX = "\nTranslate the following text to "
+_TRANSLATE_MIDDLE = ".\nReturn only the translation, no labels or explanations.\n\nText:\n"
+_BATCH_TRANSLATE_PROMPT = """
+Translate each JSON string below to {lang}.
+Return a JSON array of the same length in the same order, containing only the translations.
+
+{payload}
 """
+
+
+def generate_mcqs(topic, num_questions=5, language="English"):
+    """Generate MCQs on a given topic in the specified language."""
+    if language == "English":
+        prompt = _MCQ_PROMPT_EN.format(n=num_questions, topic=topic)
+    else:
+        prompt = _MCQ_PROMPT_LOCALIZED.format(n=num_questions, topic=topic, lang=language)
     response = _call_generative_model(prompt)
     return response.text
 
 
+def _balanced_array_end(text, start):
+    """Return the index just past the ']' closing the '[' at start, or -1."""
+    depth = 0
+    in_string = False
+    pos = start
+    while True:
+        match = _JSON_TOKEN_RE.search(text, pos)
+        if not match:
+            return -1
+        char = match.group()
+        pos = match.end()
+        if in_string:
+            if char == "\\":
+                pos += 1  # skip the escaped character
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "[":
+            depth += 1
+        elif char == "]":
+            depth -= 1
+            if depth == 0:
+                return pos
+
+
+def _parse_json_array(raw_text):
+    """Parse the first balanced JSON array embedded in raw model output."""
+    if not raw_text:
+        return None
+    start = raw_text.find("[")
+    while start != -1:
+        end = _balanced_array_end(raw_text, start)
+        if end == -1:
+            return None
+        try:
+            parsed = _json_loads(raw_text[start:end])
+            if isinstance(parsed, list):
+                return parsed
+        except ValueError:
+            pass
+        # Not JSON (e.g. a bracketed note before the payload); try the next '['
+        start = raw_text.find("[", start + 1)
+    return None
+
+
 def parse_mcqs(raw_text):
     """Parse MCQs from raw text."""
-    try:
-        start = raw_text.find("[")
-        end = raw_text.rfind("]") + 1
-        if start == -1 or end <= start:
-            return None
-        return json.loads(raw_text[start:end])
-    except Exception:
-        return None
+    return _parse_json_array(raw_text)
+
+
+def _request_translation(text, target_language):
+    """Translate text with one model call (or the cache), raising on failure."""
+    cached = translation_cache.get_translation(text, target_language)
+    if cached is not None:
+        return cached
+    prompt = "".join((_TRANSLATE_PREFIX, target_language, _TRANSLATE_MIDDLE, text, "\n"))
+    response = _call_generative_model(prompt)
+    translated = (response.text or "").strip()
+    translation_cache.set_translation(text, target_language, translated)
+    return translated
 
 
 def translate_text(text, target_language="English"):
     """Translate text to target language."""
     if target_language == "English":
         return text
-    prompt = f"""
-Translate the following text to {target_language}.
-Return only the translation, no labels or explanations.
-
-Text:
-{text}
-"""
     try:
-        response = _call_generative_model(prompt)
-        return (response.text or "").strip()
+        return _request_translation(text, target_language)
     except Exception as exc:
         st.error(f"Translation error: {exc}")
         return text
 
 
+def _translate_batch(strings, target_language="English", errors=None):
+    """Translate a list of strings with a single model call, preserving order.
+
+    Runs in worker threads, which have no Streamlit context, so failed
+    single-string fallbacks are appended to errors for the caller to report.
+    """
+    if not strings or target_language == "English":
+        return list(strings)
+
+    results = [translation_cache.get_translation(text, target_language) for text in strings]
+    missing = [idx for idx, value in enumerate(results) if value is None]
+    if not missing:
+        return results
+    pending = [strings[idx] for idx in missing]
+
+    prompt = _BATCH_TRANSLATE_PROMPT.format(
+        lang=target_language, payload=_json_dumps(pending)
+    )
+    try:
+        response = _call_generative_model(prompt)
+        translated = _parse_json_array(response.text or "")
+    except Exception:
+        translated = None
+    if (
+        not isinstance(translated, list)
+        or len(translated) != len(pending)
+        or not all(isinstance(value, str) for value in translated)
+    ):
+        # Malformed batch response: fall back to one call per string
+        translated = []
+        for text in pending:
+            try:
+                translated.append(_maybe_translate_text(text, target_language))
+            except Exception as exc:
+                if errors is not None:
+                    errors.append(str(exc))
+                translated.append(text)
+    else:
+        translated = [value.strip() for value in translated]
+        for text, value in zip(pending, translated):
+            translation_cache.set_translation(text, target_language, value)
+
+    for idx, value in zip(missing, translated):
+        results[idx] = value
+    return results
+
+
+async def _atranslate_batch(strings, target_language, semaphore, errors):
+    """Run a blocking batched translation in a worker thread."""
+    async with semaphore:
+        return await asyncio.to_thread(_translate_batch, strings, target_language, errors)
+
+
+async def _atranslate_batches(batches, target_language, errors):
+    """Translate several batches concurrently, returning results in input order."""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_TRANSLATIONS)
+    return await asyncio.gather(
+        *(_atranslate_batch(batch, target_language, semaphore, errors) for batch in batches),
+        return_exceptions=True,
+    )
+
+
 def _iter_options(raw_options):
     """Iterate over options in various formats."""
     if isinstance(raw_options, dict):
-        return list(raw_options.items())
-    if isinstance(raw_options, list):
-        return [
-            (f"{chr(64 + idx)}", value)
-            for idx, value in enumerate(raw_options, start=1)
-            if isinstance(value, str)
-        ]
-    return []
+        yield from raw_options.items()
+    elif isinstance(raw_options, list):
+        for idx, value in enumerate(raw_options):
+            if isinstance(value, str):
+                yield (_LETTERS[idx] if idx < len(_LETTERS) else chr(65 + idx)), value
+
+
+def _already_in_language(text: str, target_language: str) -> bool:
+    """Return True if text is confidently detected as the target language."""
+    if not LANGDETECT_AVAILABLE or len(text.split()) < LANGDETECT_MIN_WORDS:
+        return False
+    try:
+        return detect(text) == LANGUAGES.get(target_language)
+    except LangDetectException:
+        return False
+
+
+def _needs_translation(text: str, target_language: str) -> bool:
+    """Return True if text should be sent to the model for translation."""
+    if _SKIP_RE.match(text) or text.strip() in _SKIP_STRINGS:
+        return False
+    return not _already_in_language(text, target_language)
 
 
 def _maybe_translate_text(text: str, target_language: str) -> str:
-    """Translate text if target language is not English."""
-    if not text or target_language == "English":
+    """Translate text if target language is not English, raising on failure."""
+    if not text or target_language == "English" or not _needs_translation(text, target_language):
         return text
-    return translate_text(text, target_language)
+    return _request_translation(text, target_language)
 
 
 def _translate_mcq_items(mcqs, target_language: str):
@@ -83,23 +241,73 @@ def _translate_mcq_items(mcqs, target_language: str):
     if not mcqs:
         return translated
 
+    # Build the output structure with the original text, remembering where
+    # each translatable string lives so results can be scattered back.
+    slots = []
+    answer_links = []
     for mcq in mcqs:
-        options_translated = []
-        for letter, text in _iter_options(mcq.get("options")):
-            options_translated.append(
-                {"label": letter, "text": _maybe_translate_text(text, target_language)}
-            )
-
-        translated.append(
-            {
-                "question": _maybe_translate_text(mcq.get("question", ""), target_language),
-                "options": options_translated,
-                "answer": _maybe_translate_text(str(mcq.get("correct_answer", "")), target_language),
-                "explanation": _maybe_translate_text(
-                    mcq.get("explanation", ""), target_language
-                ),
-            }
+        options_translated = [
+            {"label": letter, "text": text}
+            for letter, text in _iter_options(mcq.get("options"))
+        ]
+        answer = str(mcq.get("correct_answer", ""))
+        item = {
+            "question": mcq.get("question", ""),
+            "options": options_translated,
+            "answer": answer,
+            "explanation": mcq.get("explanation", ""),
+        }
+        translated.append(item)
+
+        slots.append((item, "question"))
+        slots.extend((option, "text") for option in options_translated)
+        # The answer is usually one of the options (reuse its translation)
+        # or just its letter label (nothing to translate).
+        answer_option = next(
+            (option for option in options_translated if option["text"] == answer), None
         )
+        if answer_option is not None:
+            answer_links.append((item, answer_option))
+        elif answer.strip().upper() not in {
+            str(option["label"]).upper() for option in options_translated
+        }:
+            slots.append((item, "answer"))
+        slots.append((item, "explanation"))
 
-    return translated
+    if target_language == "English":
+        return translated
 
+    slots = [(container, key) for container, key in slots if container[key]]
+
+    # Translate each distinct string once (True/False, numbers and repeated
+    # options are common), skipping strings with nothing to translate or
+    # already in the target language.
+    unique = list(
+        dict.fromkeys(
+            str(container[key])
+            for container, key in slots
+            if _needs_translation(str(container[key]), target_language)
+        )
+    )
+    batches = [
+        unique[start : start + TRANSLATE_BATCH_SIZE]
+        for start in range(0, len(unique), TRANSLATE_BATCH_SIZE)
+    ]
+    errors = []
+    batch_results = asyncio.run(_atranslate_batches(batches, target_language, errors))
+    trmap = {}
+    for batch, results in zip(batches, batch_results):
+        if isinstance(results, BaseException):
+            errors.append(str(results))
+            continue  # keep the original text for this batch
+        trmap.update(zip(batch, results))
+    # Reported from this thread: st calls from the translation workers are dropped
+    for message in dict.fromkeys(errors):
+        st.error(f"Translation error: {message}")
+
+    for container, key in slots:
+        container[key] = trmap.get(str(container[key]), container[key])
+    for item, answer_option in answer_links:
+        item["answer"] = answer_option["text"]
+
+    return translated
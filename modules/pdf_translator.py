@@ -4,6 +4,12 @@ PDF Translator Module - Full PDF translation with layout preservation
 import asyncio
 import io
 import os
+import queue
+import re
+import shutil
+import tempfile
+import threading
+import time
 import uuid
 from pathlib import Path
 
@@ -17,17 +23,46 @@ from pdf2zh_next.config.model import SettingsModel
 from pdf2zh_next.config.translate_engine_model import GeminiSettings
 from pdf2zh_next.high_level import do_translate_async_stream
 
-from config.settings import PDF2ZH_JOBS_ROOT, LANGUAGES, GEMINI_API_KEY
+from config.settings import PDF2ZH_JOBS_ROOT, PDF2ZH_JOB_MAX_AGE_HOURS, LANGUAGES, GEMINI_API_KEY
 from modules.common import _write_uploaded_file
 
 
+_root_ready = False
+
+
 def _ensure_pdf2zh_job_dir():
     """Create a new job directory for PDF translation."""
+    global _root_ready
+    if not _root_ready:
+        PDF2ZH_JOBS_ROOT.mkdir(parents=True, exist_ok=True)
+        _root_ready = True
     job_dir = PDF2ZH_JOBS_ROOT / str(uuid.uuid4())
-    job_dir.mkdir(parents=True, exist_ok=True)
+    # Parent is known to exist, so a single mkdir syscall is enough
+    os.mkdir(job_dir)
     return job_dir
 
 
+def _cleanup_old_job_dirs(max_age_hours: float = PDF2ZH_JOB_MAX_AGE_HOURS):
+    """Remove job directories older than max_age_hours (orphaned by reruns)."""
+    if max_age_hours <= 0:
+        return
+    cutoff = time.time() - max_age_hours * 3600
+    try:
+        entries = list(os.scandir(PDF2ZH_JOBS_ROOT))
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            if entry.is_dir(follow_symlinks=False) and entry.stat().st_mtime < cutoff:
+                shutil.rmtree(entry.path, ignore_errors=True)
+        except OSError:
+            continue
+
+
+# Clean up stale job directories in the background at startup
+threading.Thread(target=_cleanup_old_job_dirs, daemon=True).start()
+
+
 def _build_pdf2zh_settings(lang_label: str, output_dir: Path):
     """Build settings for pdf2zh translation using Gemini API.
     
@@ -56,55 +91,32 @@ def _build_pdf2zh_settings(lang_label: str, output_dir: Path):
     return settings
 
 
-def _run_async(coro):
-    """Run async coroutine in a new event loop with proper cleanup."""
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
+# One long-lived event loop shared by all translations, run in a daemon thread
+_LOOP = asyncio.new_event_loop()
+threading.Thread(target=_LOOP.run_forever, name="pdf2zh-loop", daemon=True).start()
+
+
+def _run_async(coro, events=None, on_event=None):
+    """Run a coroutine on the shared background loop and wait for its result.
+
+    Items the coroutine puts on ``events`` are handed to ``on_event`` on the
+    calling thread, so Streamlit UI updates stay on the script thread. If the
+    caller stops waiting early (an on_event error or a Streamlit rerun/stop),
+    the coroutine is cancelled instead of running on in the background.
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, _LOOP)
     try:
-        result = loop.run_until_complete(coro)
-        # Give background tasks time to complete
-        pending = [t for t in asyncio.all_tasks(loop) if not t.done()]
-        if pending:
-            # Wait for pending tasks with a timeout
-            try:
-                loop.run_until_complete(
-                    asyncio.wait_for(
-                        asyncio.gather(*pending, return_exceptions=True),
-                        timeout=2.0
-                    )
-                )
-            except (asyncio.TimeoutError, Exception):
-                # Cancel remaining tasks if they don't complete in time
-                for task in pending:
-                    if not task.done():
-                        task.cancel()
+        if events is not None:
+            while not future.done() or not events.empty():
                 try:
-                    loop.run_until_complete(
-                        asyncio.gather(*pending, return_exceptions=True)
-                    )
-                except Exception:
-                    pass  # Ignore errors from cancelled tasks
-        return result
+                    event = events.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                on_event(event)
+        return future.result()
     finally:
-        try:
-            # Cancel any remaining tasks
-            pending = asyncio.all_tasks(loop)
-            for task in pending:
-                task.cancel()
-            # Give a moment for cleanup
-            if pending:
-                try:
-                    loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
-                except Exception:
-                    pass
-        except Exception:
-            pass  # Ignore errors during cleanup
-        finally:
-            try:
-                loop.close()
-            except Exception:
-                pass  # Ignore errors when closing
-            asyncio.set_event_loop(None)
+        if not future.done():
+            future.cancel()
 
 
 async def _stream_pdf2zh(settings: SettingsModel, pdf_path: Path, progress_callback=None):
@@ -159,16 +171,24 @@ def translate_pdf_with_pdf2zh(uploaded_file, target_language, progress_bar=None,
     input_pdf = job_dir / uploaded_file.name
     _write_uploaded_file(uploaded_file, input_pdf)
 
+    last_shown = {"percent": None, "stage": None}
+
     def _progress(event, translator_name="Gemini"):
         if not progress_bar:
             return
         overall = min(max(event.get("overall_progress", 0) / 100, 0.0), 1.0)
         stage = event.get("stage", "Processing")
+        # pdf2zh emits hundreds of ticks; only push widget updates on visible changes
+        percent = int(overall * 100)
+        if percent == last_shown["percent"] and stage == last_shown["stage"]:
+            return
+        last_shown["percent"] = percent
         # Add translator name to progress text
         progress_text = f"[{translator_name}] {stage}"
         progress_bar.progress(overall, text=progress_text)
-        if status_placeholder:
+        if status_placeholder and stage != last_shown["stage"]:
             status_placeholder.info(f"Using {translator_name}: {stage}")
+        last_shown["stage"] = stage
 
     # Use Gemini API for translation
     try:
@@ -181,7 +201,12 @@ def translate_pdf_with_pdf2zh(uploaded_file, target_language, progress_bar=None,
         settings = _build_pdf2zh_settings(lang_label, job_dir)
         settings.basic.input_files = {str(input_pdf)}
         
-        result = _run_async(_stream_pdf2zh(settings, input_pdf, lambda e: _progress(e, "Gemini")))
+        events = queue.Queue()
+        result = _run_async(
+            _stream_pdf2zh(settings, input_pdf, events.put),
+            events,
+            lambda e: _progress(e, "Gemini"),
+        )
         
         if result is None:
             raise RuntimeError("Translation completed but returned no result.")
@@ -232,32 +257,77 @@ def translate_pdf_with_pdf2zh(uploaded_file, target_language, progress_bar=None,
         )
 
 
-def create_docx_from_pdf(pdf_path: str, title: str):
-    """Create DOCX from PDF pages as images."""
+# Plain text extraction without ligature preservation; clipped to the page
+_TEXT_FLAGS = fitz.TEXT_PRESERVE_WHITESPACE | fitz.TEXT_MEDIABOX_CLIP
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _add_text_paragraphs(doc, text: str):
+    """Add PDF page text to the document, one paragraph per text block."""
+    for para in text.split('\n\n'):
+        para = para.strip()
+        if para:
+            # Clean up the paragraph
+            doc.add_paragraph(_WHITESPACE_RE.sub(" ", para))  # Normalize whitespace
+
+
+def _docx_to_bytes(doc) -> bytes:
+    """Serialize a DOCX via a temp file, avoiding a second in-memory copy."""
+    with tempfile.NamedTemporaryFile(suffix=".docx", delete=False) as tmp:
+        tmp_path = Path(tmp.name)
+    try:
+        doc.save(str(tmp_path))
+        return tmp_path.read_bytes()
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def _is_text_only_page(page, text: str) -> bool:
+    """Whether a page has text and nothing (images, vector drawings) that needs rendering."""
+    return bool(text.strip()) and not page.get_images() and not page.get_drawings()
+
+
+def _render_page(page, matrix):
+    """Render one PDF page.
+
+    Returns ("text", str) for pages that contain only text and
+    ("image", jpeg_bytes) for everything else.
+    """
+    text = page.get_text("text", sort=False, flags=_TEXT_FLAGS)
+    if _is_text_only_page(page, text):
+        return "text", text
+    pix = page.get_pixmap(matrix=matrix)
+    return "image", pix.tobytes("jpeg", jpg_quality=85)
+
+
+def create_docx_from_pdf(pdf_path: str, title: str, dpi: int = 150):
+    """Create DOCX from PDF pages as images (text-only pages are added as text)."""
     if not pdf_path or not os.path.exists(pdf_path):
         return None
     try:
         doc = Document()
         heading = doc.add_heading(title, level=0)
         heading.alignment = WD_ALIGN_PARAGRAPH.CENTER
-
-        pdf_doc = fitz.open(pdf_path)
-        zoom = 200 / 72
+        zoom = dpi / 72
         matrix = fitz.Matrix(zoom, zoom)
 
-        for index, page in enumerate(pdf_doc, start=1):
-            pix = page.get_pixmap(matrix=matrix)
-            image_stream = io.BytesIO(pix.tobytes("png"))
-            doc.add_heading(f"Page {index}", level=1)
-            doc.add_picture(image_stream, width=doc.sections[0].page_width - Inches(1))
-            if index < len(pdf_doc):
-                doc.add_page_break()
+        with fitz.open(pdf_path) as pdf_doc:
+            page_count = pdf_doc.page_count
+            # Text-only pages (such as most pdf2zh output) are added as text,
+            # which is far faster and smaller than rasterizing them; every page
+            # is judged on its own, so figures anywhere in the file are kept.
+            # PyMuPDF is not thread-safe, so pages are rendered one at a time
+            for index, page in enumerate(pdf_doc, start=1):
+                kind, content = _render_page(page, matrix)
+                doc.add_heading(f"Page {index}", level=1)
+                if kind == "text":
+                    _add_text_paragraphs(doc, content)
+                else:
+                    doc.add_picture(io.BytesIO(content), width=doc.sections[0].page_width - Inches(1))
+                if index < page_count:
+                    doc.add_page_break()
 
-        pdf_doc.close()
-        buffer = io.BytesIO()
-        doc.save(buffer)
-        buffer.seek(0)
-        return buffer.getvalue()
+        return _docx_to_bytes(doc)
     except Exception as exc:
         st.error(f"DOCX creation from PDF failed: {exc}")
         return None
@@ -273,33 +343,25 @@ def create_docx_from_pdf_text(pdf_path: str, title: str):
         heading.alignment = WD_ALIGN_PARAGRAPH.CENTER
         
         pdf_doc = fitz.open(pdf_path)
+        page_count = pdf_doc.page_count
         
         for page_num, page in enumerate(pdf_doc, start=1):
             # Extract text from the page
-            text = page.get_text()
+            text = page.get_text("text", sort=False, flags=_TEXT_FLAGS)
             
             if text.strip():
                 # Add page heading
                 doc.add_heading(f"Page {page_num}", level=1)
                 
                 # Split text into paragraphs and add them
-                paragraphs = text.split('\n\n')
-                for para in paragraphs:
-                    para = para.strip()
-                    if para:
-                        # Clean up the paragraph
-                        para = ' '.join(para.split())  # Normalize whitespace
-                        doc.add_paragraph(para)
+                _add_text_paragraphs(doc, text)
                 
                 # Add page break except for last page
-                if page_num < len(pdf_doc):
+                if page_num < page_count:
                     doc.add_page_break()
         
         pdf_doc.close()
-        buffer = io.BytesIO()
-        doc.save(buffer)
-        buffer.seek(0)
-        return buffer.getvalue()
+        return _docx_to_bytes(doc)
     except Exception as exc:
         st.error(f"DOCX creation from PDF text failed: {exc}")
         return None
@@ -1,168 +1,264 @@
 """
 Solution Generator Module - PDF question solving and translation
 """
+import asyncio
 import json
+import os
 import re
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 import fitz  # PyMuPDF
-from sympy import Eq, solve, symbols
 
-from config.settings import SOLUTION_JOBS_ROOT, PIPELINE_LABELS
+from config.settings import SOLUTION_JOBS_ROOT, PIPELINE_LABELS, TRANSLATE_BATCH_SIZES_PATH
+from modules import llm_cache
 from modules.common import (
     _call_generative_model,
-    extract_json_block,
-    extract_inner_json,
+    _call_generative_model_cached,
     _clean_text,
+    _json_dumps,
+    _json_loads,
+    _write_json_file,
     _write_uploaded_file,
     create_docx,
+    parse_json_response,
 )
 
+# Question blocks solved in parallel by the fallback solver (keeps under Gemini RPM)
+MAX_CONCURRENT_SOLVES = 8
+# Question blocks sent to Gemini per fallback solve call
+SOLVE_BATCH_SIZE = 10
+# Translation calls allowed in flight at once (keeps under Gemini RPM)
+MAX_CONCURRENT_TRANSLATIONS = 8
+# Formatted characters packed into one batched translation call (leaves room for the prompt)
+TRANSLATE_BATCH_CHARS = 36000
+# Times a failed or truncated batch is retried in halves before item-level fallback
+TRANSLATE_SPLIT_RETRIES = 3
+# Items per JSON-array call when batches fall back to item-level translation
+TRANSLATE_FALLBACK_GROUP_SIZE = 8
+# Bounds for the adaptive items-per-batch, which keeps replies within the output limit
+TRANSLATE_BATCH_MIN_ITEMS = 2
+TRANSLATE_BATCH_MAX_ITEMS = 12
+# Batches faster than this (seconds) count towards growing the batch size
+TRANSLATE_BATCH_TARGET_SECONDS = 30.0
+# Background writer for job files nothing reads until the pipeline returns
+_IO_EXECUTOR = ThreadPoolExecutor(max_workers=2)
+# Answer-key explanations requested per model call
+EXPLANATION_BATCH_SIZE = 10
+# Quality for extracted images saved as JPEG (opaque images only)
+IMAGE_JPEG_QUALITY = 85
+# PDFs up to this size are read into memory once and opened from bytes
+PDF_IN_MEMORY_MAX_BYTES = 500_000_000
+
+# Answer key
+_KEY_MARKER_RE = re.compile(r"\bKEY\b", re.IGNORECASE)
+_KEY_PAIR_RE = re.compile(r"(\d{1,3})\s*[.\-]\s*(\d)")
+# Question segmentation of raw PDF text
+_QUESTION_START_RE = re.compile(r"(?m)^\s*(\d{1,3})\.\s*")
+_OPTION_RE = re.compile(r"(?s)(\d)\)\s*(.*?)(?=(?:\n\s*\d\)|$))")
+# SymPy equation cleanup
+_NON_EQUATION_CHARS_RE = re.compile(r"[^\dxX\+\-\*/=\.\(\)\s]")
+# Structured solver output
+_SECTION_SEPARATOR_RE = re.compile(r"={10,}")
+_SECTION_HEADER_RE = re.compile(r"SECTION:\s*(.+)", re.IGNORECASE)
+_QUESTION_SEPARATOR_RE = re.compile(r"-{10,}")
+_SOLVED_QNUM_RE = re.compile(r"Question\s+(\d+):", re.IGNORECASE)
+_SOLVED_QUESTION_RE = re.compile(r"Question\s+(\d+):\s*(.+?)(?:\n|Options:)", re.DOTALL | re.IGNORECASE)
+_SOLVED_OPTIONS_RE = re.compile(r"Options:\s*(.+?)(?:\n|CORRECT)", re.DOTALL | re.IGNORECASE)
+_CORRECT_ANSWER_RE = re.compile(r"CORRECT ANSWER:\s*(\d+)\)\s*(.+)", re.IGNORECASE)
+_SOLUTION_RE = re.compile(r"SOLUTION:\s*(.+?)(?:\n-{10,}|$)", re.DOTALL | re.IGNORECASE)
+# "1) text | 2) text" option lists (solver and translated output)
+_OPTION_LIST_SEP_RE = re.compile(r"\s*\|\s*")
+_NUMBERED_OPTION_RE = re.compile(r"(\d+)\)\s*(.+)")
+# Translated output
+_TRANSLATED_SEPARATOR_RE = re.compile(r"═{3,}")
+_TRANSLATED_QNUM_RE = re.compile(r"Q(\d+):\s*(.+?)(?:\n|Options:)", re.DOTALL | re.IGNORECASE)
+_TRANSLATED_Q_RE = re.compile(r"Q:\s*(.+?)(?:\n|Options:)", re.DOTALL | re.IGNORECASE)
+_TRANSLATED_OPTIONS_RE = re.compile(r"Options:\s*(.+?)(?:\n|✅)", re.DOTALL | re.IGNORECASE)
+_TRANSLATED_ANSWER_RE = re.compile(r"✅\s*Answer:\s*(.+?)(?:\n|📝)", re.DOTALL | re.IGNORECASE)
+_TRANSLATED_SOLUTION_RE = re.compile(r"📝\s*Solution:\s*(.+?)(?:\n|═|$)", re.DOTALL | re.IGNORECASE)
+# Options embedded in question text (DOCX build)
+_LINE_PAREN_OPTION_RE = re.compile(r"(?m)^\s*(\d+)\)\s*(.+?)(?=\n\s*\d+\)|$)")
+_LINE_DOT_OPTION_RE = re.compile(r"(?m)^\s*(\d+)\.\s*(.+?)(?=\n\s*\d+\.|$)")
+_BRACKETED_OPTION_RE = re.compile(r"(?m)\((\d+)\)\s*(.+?)(?=\((\d+)\)|$)")
+_ANSWER_OPTION_RE = re.compile(r"option\s*(\d+)|(\d+)\)", re.IGNORECASE)
+
+
+# Explanations for answer-key answers, singly and in batches
+_EXPLANATION_PROMPT = """
+You are a helpful math tutor. Assume the provided answer is correct and describe,
+in 2-3 sentences, the logical steps a student would take to reach it. Focus on the
+method (e.g., compare totals, apply ratios, plug values into the formula).
+Do NOT mention missing information, inconsistencies, or answer keys. Keep the tone confident.
 
-def _pipeline_extract_pdf(input_pdf_path: Path, job_dir: Path):
-    """Extract text and images from PDF."""
-    images_dir = job_dir / "images"
-    images_dir.mkdir(parents=True, exist_ok=True)
-    extracted_json = job_dir / "extracted_data.json"
+QUESTION:
+{question_text}
 
-    doc = fitz.open(str(input_pdf_path))
-    pages_data = []
+CORRECT ANSWER:
+{answer_text}
+"""
+_BATCH_EXPLANATION_PROMPT = """
+You are a helpful math tutor. For each question below, assume the provided answer is correct and
+describe, in 2-3 sentences, the logical steps a student would take to reach it. Focus on the
+method (e.g., compare totals, apply ratios, plug values into the formula).
+Do NOT mention missing information, inconsistencies, or answer keys. Keep the tone confident.
 
-    for page_number, page in enumerate(doc, start=1):
-        text = page.get_text() or ""
-        images = []
-        for img_index, img in enumerate(page.get_images(full=True), start=1):
-            xref = img[0]
-            try:
-                pix = fitz.Pixmap(doc, xref)
-                if pix.n > 4:
-                    pix = fitz.Pixmap(fitz.csRGB, pix)
-                image_path = images_dir / f"page{page_number}_img{img_index}.png"
-                pix.save(image_path)
-                images.append(str(image_path))
-            except Exception:
-                continue
-        pages_data.append({"page": page_number, "text": text.strip(), "images": images})
+Return ONLY a JSON array of explanation strings, one per question, in the same order.
 
-    with extracted_json.open("w", encoding="utf-8") as f:
-        json.dump(pages_data, f, ensure_ascii=False, indent=2)
+QUESTIONS:
+{payload}
+"""
 
-    return pages_data, extracted_json
+# Fallback solver prompts, per question and batched (sections headed "### Q<index>")
+_BLOCK_SOLVE_PROMPT = """
+You are an expert exam solver. Extract and solve every question and MCQ from the text below.
 
+For each question:
 
-def _extract_answer_key_from_text(full_text: str) -> tuple[dict[int, str], int | None]:
-    """Extract answer key from text."""
-    if not full_text:
-        return {}, None
-    match = re.search(r"\bKEY\b", full_text, flags=re.IGNORECASE)
-    if not match:
-        return {}, None
-    key_section = full_text[match.end() :]
-    pairs = re.findall(r"(\d{1,3})\s*[.\-]\s*(\d)", key_section)
-    key_map = {}
-    for question, option_digit in pairs:
-        try:
-            key_map[int(question)] = option_digit
-        except ValueError:
-            continue
-    return key_map, match.start()
+- Detect the question number if present.
 
+- Copy the full question text exactly as written.
 
-def _segment_questions_from_text(full_text: str):
-    """Segment questions from text."""
-    if not full_text:
-        return []
+- Identify the correct answer using reasoning.
 
-    question_pattern = re.compile(
-        r"(?sm)^\s*(\d{1,3})\.\s*(.*?)(?=^\s*\d{1,3}\.\s*|$)"
-    )
-    option_pattern = re.compile(r"(?s)(\d)\)\s*(.*?)(?=(?:\n\s*\d\)|$))")
+- If the question is MCQ, DO NOT return "Option 1/2/3/4/5".
 
-    blocks = []
-    for match in question_pattern.finditer(full_text):
-        number = match.group(1).strip()
-        raw_block = match.group(2).strip()
-        if not raw_block:
-            continue
+  Instead, return the ACTUAL ANSWER TEXT. Example:
 
-        option_matches = list(option_pattern.finditer(raw_block))
-        if option_matches:
-            first_option_start = option_matches[0].start()
-            question_prompt = raw_block[:first_option_start].strip()
-        else:
-            question_prompt = raw_block.strip()
+  - Correct: "Carbon dioxide"
 
-        options = [
-            {"label": opt.group(1).strip(), "text": opt.group(2).strip()}
-            for opt in option_matches
-        ]
+  - Wrong: "Option C" or "Option 3"
 
-        blocks.append(
-            {
-                "question_number": number,
-                "question_text": question_prompt,
-                "options": options,
-                "raw_block": raw_block,
-            }
-        )
+- For non-MCQs, return the solved final answer clearly.
 
-    return blocks
+- Provide a concise 2-line explanation for how you got the answer.
 
+Output Format (STRICT):
 
-def _solve_simple_equation(text: str):
-    """Solve simple equations using SymPy."""
-    if not text:
-        return None
-    x = symbols("x")
-    try:
-        cleaned = re.sub(r"[^\dxX\+\-\*/=\.\(\)\s]", "", text).replace("X", "x")
-        if "=" not in cleaned:
-            return None
-        lhs, rhs = cleaned.split("=", 1)
-        lhs = re.sub(r"(?<=\d)x", "*x", lhs)
-        rhs = re.sub(r"(?<=\d)x", "*x", rhs)
-        equation = Eq(eval(lhs), eval(rhs))
-        solution = solve(equation, x)
-        return solution
-    except Exception:
-        return None
+Return ONLY a valid JSON array:
 
+[
+  {{
+    "question_number": "...",
+    "question_text": "...",
+    "answer": "...",  
+    "explanation": "..."
+  }}
+]
 
-def _generate_llm_explanation(question_text: str, answer_text: str) -> str:
-    """Generate explanation using LLM."""
-    if not question_text or not answer_text:
-        return "Explanation unavailable."
-    prompt = f"""
-You are a helpful math tutor. Assume the provided answer is correct and describe,
-in 2-3 sentences, the logical steps a student would take to reach it. Focus on the
-method (e.g., compare totals, apply ratios, plug values into the formula).
-Do NOT mention missing information, inconsistencies, or answer keys. Keep the tone confident.
+STRICT RULES:
 
-QUESTION:
-{question_text}
+- NO markdown, NO ```json blocks.
 
-CORRECT ANSWER:
-{answer_text}
+- JSON only.
+
+- Do NOT translate or paraphrase questions.
+
+- If options exist, extract the correct option *text*, not the option number.
+
+- Produce the best possible answer with maximum accuracy.
+
+TEXT:
+{block_text}
 """
-    try:
-        response = _call_generative_model(prompt)
-        return (response.text or "").strip()
-    except Exception as exc:
-        return f"Explanation unavailable ({exc})."
+_BATCH_BLOCK_SOLVE_PROMPT = """
+You are an expert exam solver. Solve the question in each numbered section below.
 
+For each section:
 
-def _pipeline_solve_pages(pages, job_dir: Path, progress_callback=None):
-    """Solve questions from PDF pages."""
-    combined_text = "\n".join(page.get("text", "") for page in pages if page.get("text"))
-    answer_key, key_start = _extract_answer_key_from_text(combined_text)
-    questions_text = combined_text if key_start is None else combined_text[:key_start]
-    
-    # Use new comprehensive prompt to solve all questions at once
-    char_limit = 50000  # Limit to avoid token limits
-    pdf_text_truncated = questions_text[:char_limit] if len(questions_text) > char_limit else questions_text
-    
-    prompt = f"""
+- Identify the correct answer using reasoning.
+
+- If the question is MCQ, DO NOT return "Option 1/2/3/4/5"; return the ACTUAL ANSWER TEXT
+  (e.g. "Carbon dioxide", not "Option C" or "Option 3").
+
+- For non-MCQs, return the solved final answer clearly.
+
+- Provide a concise 2-line explanation for how you got the answer.
+
+Return ONLY a valid JSON array with one object per section:
+
+[
+  {{
+    "index": <N from the "### QN" heading>,
+    "answer": "...",
+    "explanation": "..."
+  }}
+]
+
+NO markdown, NO ```json blocks. Do NOT translate or paraphrase questions.
+
+SECTIONS:
+{sections}
+"""
+
+# Formatted-items translation prompt, shared by every translation batch
+_TRANSLATE_PROMPT = """
+Translate the following MCQ solutions to {target_language}.
+Translate question text, options and explanations into natural, fluent {target_language}; keep math symbols, numbers and formulas as-is.
+Return a JSON array with one object per question, in the same order, with question_number, question_text, options (a list of {{"label", "text"}}), answer and explanation.
+
+**Content to translate:**
+
+{content}
+"""
+# Single-item translation prompt (fallback path; also the per-item cache key)
+_ITEM_TRANSLATE_PROMPT = """
+Translate the following solved MCQ into {target_language}.
+
+Keep all numbers, symbols, and math expressions unchanged.
+
+Return output strictly as JSON like:
+{{
+  "question_text_{lang_lower}": "...",
+  "answer_{lang_lower}": "...",
+  "explanation_{lang_lower}": "..."
+}}
+
+Question: {question}
+Answer: {answer}
+Explanation: {explanation}
+"""
+_ITEM_GROUP_TRANSLATE_PROMPT = """
+Translate each of the following solved MCQs into {target_language}.
+
+Keep all numbers, symbols, and math expressions unchanged.
+
+Return a JSON array with one object per MCQ, in the same order, with question_text, answer and explanation.
+
+MCQS:
+{payload}
+"""
+# Gemini JSON mode for translation replies, so they parse without the layout regexes
+_TRANSLATED_BATCH_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {
+            "question_number": {"type": "STRING"},
+            "question_text": {"type": "STRING"},
+            "options": {
+                "type": "ARRAY",
+                "items": {
+                    "type": "OBJECT",
+                    "properties": {"label": {"type": "STRING"}, "text": {"type": "STRING"}},
+                },
+            },
+            "answer": {"type": "STRING"},
+            "explanation": {"type": "STRING"},
+        },
+        "required": ["question_text"],
+    },
+}
+_TRANSLATE_GENERATION_CONFIG = {
+    "response_mime_type": "application/json",
+    "response_schema": _TRANSLATED_BATCH_SCHEMA,
+}
+
+# Whole-document solve prompt; the document text is joined between head and tail
+_SOLVE_PROMPT_HEAD = """
 You are an expert MCQ solver. Analyze ALL questions in the PDF and provide CONCISE, ACCURATE solutions for EVERY question.
 
 **CRITICAL REQUIREMENTS:**
@@ -322,184 +418,502 @@ Uses Modus Ponens: If P then Q, P is true, therefore Q
 
 **Document Content:**
 
-{pdf_text_truncated}
+"""
+_SOLVE_PROMPT_TAIL = """
 
 Now solve ALL MCQs with proper section organization!
 """
-    
-    # Try to solve all questions at once with the new prompt
-    try:
-        if progress_callback:
-            progress_callback(0, 1)
-        
-        response = _call_generative_model(prompt)
-        full_solution_text = response.text.strip()
-        
-        # Parse the structured output to extract questions
-        results = _parse_structured_solution(full_solution_text, answer_key)
-        
-        if progress_callback:
-            progress_callback(1, 1)
-        
-        # If we got results, return them
-        if results:
-            solved_file = job_dir / "solved_extracted_data.json"
-            with solved_file.open("w", encoding="utf-8") as f:
-                json.dump(results, f, ensure_ascii=False, indent=2)
-            return results, solved_file
-    
-    except Exception as exc:
-        # Fallback to original method if new approach fails
-        pass
-    
-    # Fallback to original segmentation method
-    question_blocks = _segment_questions_from_text(questions_text)
 
-    results = []
-    total = len(question_blocks) or 1
 
-    for idx, block in enumerate(question_blocks, start=1):
-        qnum = block.get("question_number", "")
-        options = block.get("options", [])
-        answer = ""
-        answer_option = None
-        explanation = ""
-        method = "answer_key" if answer_key else "llm"
-        used_answer_key = False
+def _open_pdf(source: str | bytes):
+    """Open a PDF from a path or from its bytes."""
+    if isinstance(source, bytes):
+        return fitz.open(stream=source, filetype="pdf")
+    return fitz.open(source)
 
-        try:
-            qnum_int = int(qnum)
-        except (TypeError, ValueError):
-            qnum_int = None
-
-        if qnum_int is not None and answer_key:
-            opt_digit = answer_key.get(qnum_int)
-            if opt_digit:
-                answer_option = opt_digit
-                selected_option = next(
-                    (opt for opt in options if opt.get("label") == opt_digit), None
-                )
-                if selected_option:
-                    answer = f"{selected_option['label']}) {selected_option['text']}"
+
+def _extract_pages(doc, images_dir: Path):
+    """Extract text and images for every page of an open document."""
+    pages_data = []
+    for page_number, page in enumerate(doc, start=1):
+        text = page.get_text() or ""
+        images = []
+        for img_index, img in enumerate(page.get_images(full=True), start=1):
+            xref = img[0]
+            image_stem = images_dir / f"page{page_number}_img{img_index}"
+            info = None
+            # Only JPEG streams (filter in get_images' 9th field) take the as-is path;
+            # extract_image would decode and re-encode anything else to PNG
+            if img[8] == "DCTDecode":
+                try:
+                    info = doc.extract_image(xref)
+                except Exception:
+                    pass
+            try:
+                if info and info.get("ext") in ("jpeg", "jpg"):
+                    # Embedded JPEGs (CMYK included) are stored as-is, skipping a
+                    # decode, colorspace conversion and re-encode
+                    image_path = image_stem.with_suffix(".jpg")
+                    image_path.write_bytes(info["image"])
                 else:
-                    answer = f"Option {opt_digit}"
-                used_answer_key = True
-                method = "answer_key"
-
-        block_text = block.get("raw_block", "")
-
-        if not answer:
-            sympy_solution = _solve_simple_equation(block_text)
-            if sympy_solution:
-                answer = str(sympy_solution)
-                explanation = "Solved automatically with SymPy."
-                method = "sympy"
-            else:
-                prompt = f"""
-You are an expert exam solver. Extract and solve every question and MCQ from the text below.
+                    pix = fitz.Pixmap(doc, xref)
+                    if pix.n - pix.alpha > 3:
+                        pix = fitz.Pixmap(fitz.csRGB, pix)
+                    if pix.alpha:
+                        # JPEG has no alpha channel
+                        image_path = image_stem.with_suffix(".png")
+                        pix.save(image_path)
+                    else:
+                        image_path = image_stem.with_suffix(".jpg")
+                        image_path.write_bytes(pix.tobytes("jpeg", jpg_quality=IMAGE_JPEG_QUALITY))
+                images.append(str(image_path))
+            except Exception:
+                continue
+        pages_data.append({"page": page_number, "text": text.strip(), "images": images})
+    return pages_data
 
-For each question:
 
-- Detect the question number if present.
+def _pipeline_extract_pdf(input_pdf_path: Path, job_dir: Path):
+    """Extract text and images from PDF."""
+    images_dir = job_dir / "images"
+    images_dir.mkdir(parents=True, exist_ok=True)
+    extracted_json = job_dir / "extracted_data.json"
 
-- Copy the full question text exactly as written.
+    # Read the file in one go rather than through MuPDF's many small reads;
+    # very large files stay on disk
+    pdf_path = Path(input_pdf_path)
+    if pdf_path.stat().st_size <= PDF_IN_MEMORY_MAX_BYTES:
+        pdf_source = pdf_path.read_bytes()
+    else:
+        pdf_source = str(pdf_path)
+    # PyMuPDF is not thread-safe, so pages are extracted one at a time
+    with _open_pdf(pdf_source) as doc:
+        pages_data = _extract_pages(doc, images_dir)
 
-- Identify the correct answer using reasoning.
+    _write_json_file(extracted_json, pages_data)
 
-- If the question is MCQ, DO NOT return "Option 1/2/3/4/5".
+    return pages_data, extracted_json
 
-  Instead, return the ACTUAL ANSWER TEXT. Example:
 
-  - Correct: "Carbon dioxide"
+def _extract_answer_key_from_text(full_text: str) -> tuple[dict[int, str], int | None]:
+    """Extract answer key from text."""
+    if not full_text:
+        return {}, None
+    match = _KEY_MARKER_RE.search(full_text)
+    if not match:
+        return {}, None
+    # \d{1,3} always parses with int(), and scanning from match.end() avoids slicing the tail
+    key_map = {int(pair.group(1)): pair.group(2) for pair in _KEY_PAIR_RE.finditer(full_text, match.end())}
+    return key_map, match.start()
 
-  - Wrong: "Option C" or "Option 3"
 
-- For non-MCQs, return the solved final answer clearly.
+def _iter_question_spans(full_text: str, endpos: int | None = None):
+    """Yield (number, start, end) for each question's text span in full_text[:endpos].
+
+    Questions run from their "N." marker to the end of that line, or are empty
+    when the next line starts another question. Scans forward once instead of
+    testing a lookahead at every character.
+    """
+    if endpos is None:
+        endpos = len(full_text)
+    pos = 0
+    while True:
+        match = _QUESTION_START_RE.search(full_text, pos, endpos)
+        if not match:
+            return
+        start = match.end()
+        if _QUESTION_START_RE.match(full_text, start, endpos):
+            # Marker with no text before the next question starts
+            yield match.group(1), start, start
+            pos = start
+            continue
+        end = full_text.find("\n", start, endpos)
+        if end == -1:
+            end = endpos
+        yield match.group(1), start, end
+        pos = end
 
-- Provide a concise 2-line explanation for how you got the answer.
 
-Output Format (STRICT):
+def _segment_questions_from_text(full_text: str, endpos: int | None = None):
+    """Segment questions from text, optionally only up to endpos."""
+    if not full_text:
+        return []
 
-Return ONLY a valid JSON array:
+    blocks = []
+    for number, start, end in _iter_question_spans(full_text, endpos):
+        number = number.strip()
+        raw_block = full_text[start:end].strip()
+        if not raw_block:
+            continue
+        # Spans start after the marker's whitespace, so only the tail is trimmed
+        end = start + len(raw_block)
 
-[
-  {{
-    "question_number": "...",
-    "question_text": "...",
-    "answer": "...",  
-    "explanation": "..."
-  }}
-]
+        # Scan options in place within the same span rather than a copy of it
+        option_matches = list(_OPTION_RE.finditer(full_text, start, end))
+        if option_matches:
+            question_prompt = full_text[start : option_matches[0].start()].strip()
+        else:
+            question_prompt = raw_block
 
-STRICT RULES:
+        options = [
+            {"label": opt.group(1).strip(), "text": opt.group(2).strip()}
+            for opt in option_matches
+        ]
 
-- NO markdown, NO ```json blocks.
+        blocks.append(
+            {
+                "question_number": number,
+                "question_text": question_prompt,
+                "options": options,
+                "raw_block": raw_block,
+            }
+        )
 
-- JSON only.
+    return blocks
 
-- Do NOT translate or paraphrase questions.
 
-- If options exist, extract the correct option *text*, not the option number.
+def _solve_simple_equation(text: str):
+    """Solve simple equations using SymPy."""
+    if not text:
+        return None
+    cleaned = _NON_EQUATION_CHARS_RE.sub("", text).replace("X", "x")
+    if "=" not in cleaned:
+        return None
+    return _solve_cleaned_equation(cleaned)
 
-- Produce the best possible answer with maximum accuracy.
 
-TEXT:
-{block_text}
-"""
-                try:
-                    response = _call_generative_model(prompt)
-                    parsed = extract_inner_json(response.text.strip())
-                    if not parsed:
-                        parsed = json.loads(extract_json_block(response.text))
-                    
-                    # Handle both array and single object responses
-                    if isinstance(parsed, list) and len(parsed) > 0:
-                        # If array, take the first item (since we're processing one block at a time)
-                        parsed = parsed[0]
-                    
-                    answer = parsed.get("answer", "")
-                    explanation = parsed.get("explanation", "")
-                    method = "gemini"
-                except Exception as exc:
-                    answer = ""
-                    explanation = f"Failed to solve: {exc}"
-                    method = "error"
-
-        question_body = block.get("question_text", "").strip()
-        
-        # Build formatted question with options for display
-        question_lines = []
-        if question_body:
-            question_lines.append(question_body)
-        if options:
-            for opt in options:
-                question_lines.append(f"{opt['label']}) {opt['text']}")
-        formatted_question = "\n".join(line for line in question_lines if line).strip()
+@lru_cache(maxsize=512)
+def _solve_cleaned_equation(cleaned: str):
+    """Solve an already-cleaned "lhs=rhs" equation; the same ones recur across papers."""
+    try:
+        # SymPy is slow to import; only blocks that look like equations get here
+        from sympy import Eq, solve, symbols
+        from sympy.parsing.sympy_parser import (
+            implicit_multiplication_application,
+            parse_expr,
+            standard_transformations,
+        )
+
+        lhs, rhs = cleaned.split("=", 1)
+        x = symbols("x")
+        local_dict = {"x": x}
+        # "2x" reads as 2*x
+        transformations = standard_transformations + (implicit_multiplication_application,)
+        equation = Eq(
+            parse_expr(lhs, local_dict=local_dict, transformations=transformations),
+            parse_expr(rhs, local_dict=local_dict, transformations=transformations),
+        )
+        return solve(equation, x)
+    except Exception:
+        return None
+
+
+def _generate_llm_explanation(question_text: str, answer_text: str) -> str:
+    """Generate explanation using LLM."""
+    if not question_text or not answer_text:
+        return "Explanation unavailable."
+    prompt = _EXPLANATION_PROMPT.format(question_text=question_text, answer_text=answer_text)
+    try:
+        return _call_generative_model_cached(prompt, _parse_explanation)
+    except Exception as exc:
+        return f"Explanation unavailable ({exc})."
+
+
+def _parse_explanation(text: str) -> str:
+    """Accept a non-empty explanation reply."""
+    explanation = (text or "").strip()
+    if not explanation:
+        raise ValueError("Empty explanation")
+    return explanation
+
+
+def _explain_batch(pairs: list[tuple[str, str]]) -> list[str]:
+    """Explain several (question, answer) pairs with one model call, preserving order."""
+    # Pairs explained before (singly or in a batch) are served from the
+    # per-pair cache entry, so only new pairs go into the batch prompt
+    prompts = [
+        _EXPLANATION_PROMPT.format(question_text=question, answer_text=answer)
+        for question, answer in pairs
+    ]
+    explanations = [llm_cache.get_response(prompt) for prompt in prompts]
+    missing = [idx for idx, value in enumerate(explanations) if value is None]
+    if missing:
+        payload = _json_dumps(
+            [{"question": pairs[idx][0], "answer": pairs[idx][1]} for idx in missing]
+        )
+
+        def _parse_batch(text):
+            parsed = parse_json_response(text)
+            if not (
+                isinstance(parsed, list)
+                and len(parsed) == len(missing)
+                and all(isinstance(value, str) and value.strip() for value in parsed)
+            ):
+                raise ValueError("Malformed explanation batch")
+            return parsed
+
+        try:
+            parsed = _call_generative_model_cached(_BATCH_EXPLANATION_PROMPT.format(payload=payload), _parse_batch)
+        except Exception:
+            parsed = None
+        if parsed is not None:
+            for idx, value in zip(missing, parsed):
+                explanations[idx] = value
+                llm_cache.set_response(prompts[idx], value)
+        else:
+            # Malformed batch response: fall back to one call per pair
+            for idx in missing:
+                explanations[idx] = _generate_llm_explanation(*pairs[idx])
+    return [value.strip() for value in explanations]
+
+
+async def _aexplain_batches(pairs: list[tuple[str, str]], chunks: list[list[int]], explanations: list[str]):
+    """Explain each chunk of pair indices concurrently, filling explanations in place."""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_SOLVES)
+
+    async def _run(chunk):
+        async with semaphore:
+            batch = await asyncio.to_thread(_explain_batch, [pairs[idx] for idx in chunk])
+        for idx, explanation in zip(chunk, batch):
+            explanations[idx] = explanation
+
+    await asyncio.gather(*(_run(chunk) for chunk in chunks))
+
+
+def _generate_llm_explanations(pairs: list[tuple[str, str]]) -> list[str]:
+    """Generate explanations for many (question, answer) pairs using batched LLM calls."""
+    explanations = ["Explanation unavailable."] * len(pairs)
+    todo = [idx for idx, (question, answer) in enumerate(pairs) if question and answer]
+    chunks = [
+        todo[start : start + EXPLANATION_BATCH_SIZE]
+        for start in range(0, len(todo), EXPLANATION_BATCH_SIZE)
+    ]
+    if chunks:
+        asyncio.run(_aexplain_batches(pairs, chunks, explanations))
+    return explanations
 
-        if used_answer_key and answer:
-            explanation = _generate_llm_explanation(
-                formatted_question or block_text, answer
+
+def _solve_locally(block: dict, answer_key: dict):
+    """Answer a block from the answer key or SymPy; None means it needs Gemini.
+
+    Returns (answer, answer_option, explanation, method).
+    """
+    qnum = block.get("question_number", "")
+    options = block.get("options", [])
+
+    try:
+        qnum_int = int(qnum)
+    except (TypeError, ValueError):
+        qnum_int = None
+
+    if qnum_int is not None and answer_key:
+        opt_digit = answer_key.get(qnum_int)
+        if opt_digit:
+            selected_option = next(
+                (opt for opt in options if opt.get("label") == opt_digit), None
             )
+            if selected_option:
+                answer = f"{selected_option['label']}) {selected_option['text']}"
+            else:
+                answer = f"Option {opt_digit}"
+            return answer, opt_digit, "", "answer_key"
 
-        results.append(
-            {
-                "question_number": qnum,
-                "question_text": formatted_question or block.get("raw_block", ""),
-                "question_body": question_body or block.get("question_text", "").strip(),
-                "options": options if options else [],
-                "answer": answer,
-                "answer_option": answer_option,
-                "explanation": explanation,
-                "method": method,
-            }
+    sympy_solution = _solve_simple_equation(block.get("raw_block", ""))
+    if sympy_solution:
+        return str(sympy_solution), None, "Solved automatically with SymPy.", "sympy"
+    return None
+
+
+def _solve_block_with_llm(block: dict) -> tuple[str, str, str]:
+    """Solve one block with Gemini, returning (answer, explanation, method)."""
+    prompt = _BLOCK_SOLVE_PROMPT.format(block_text=block.get("raw_block", ""))
+    try:
+        parsed = _call_generative_model_cached(prompt, _parse_block_solution)
+        return parsed.get("answer", ""), parsed.get("explanation", ""), "gemini"
+    except Exception as exc:
+        return "", f"Failed to solve: {exc}", "error"
+
+
+def _parse_block_solution(text: str) -> dict:
+    """Parse a single-block solve reply into its solution object."""
+    parsed = parse_json_response(text)
+    
+    # Handle both array and single object responses
+    if isinstance(parsed, list) and len(parsed) > 0:
+        # If array, take the first item (since we're processing one block at a time)
+        parsed = parsed[0]
+    
+    if not isinstance(parsed, dict):
+        raise ValueError("Expected a JSON object with the solution")
+    return parsed
+
+
+def _parse_batch_solutions(text: str) -> list:
+    """Parse a batched solve reply, which must be a JSON array."""
+    parsed = parse_json_response(text)
+    if not isinstance(parsed, list):
+        raise ValueError("Expected a JSON array of solutions")
+    return parsed
+
+
+def _solve_blocks_with_llm(blocks: list[dict]) -> list[tuple[str, str, str]]:
+    """Solve several blocks with one Gemini call, preserving order."""
+    # Blocks solved before (singly or in a batch) are served from the
+    # per-block cache entry, so only new blocks go into the batch prompt
+    prompts = [_BLOCK_SOLVE_PROMPT.format(block_text=block.get("raw_block", "")) for block in blocks]
+    solved = [None] * len(blocks)
+    missing = [idx for idx, prompt in enumerate(prompts) if llm_cache.get_response(prompt) is None]
+    if len(missing) > 1:
+        sections = "\n\n".join(
+            f"### Q{index}\n{blocks[idx].get('raw_block', '')}"
+            for index, idx in enumerate(missing, start=1)
         )
+        try:
+            parsed = _call_generative_model_cached(
+                _BATCH_BLOCK_SOLVE_PROMPT.format(sections=sections), _parse_batch_solutions
+            )
+        except Exception:
+            parsed = []
+        for entry in parsed:
+            if not isinstance(entry, dict) or "answer" not in entry:
+                continue
+            try:
+                index = int(entry.get("index"))
+            except (TypeError, ValueError):
+                continue
+            if not 1 <= index <= len(missing):
+                continue
+            idx = missing[index - 1]
+            answer, explanation = entry.get("answer", ""), entry.get("explanation", "")
+            solved[idx] = (answer, explanation, "gemini")
+            llm_cache.set_response(prompts[idx], _json_dumps([{"answer": answer, "explanation": explanation}]))
+    # Cached blocks and any the batch reply skipped go through the single-block path
+    return [
+        result if result is not None else _solve_block_with_llm(block)
+        for block, result in zip(blocks, solved)
+    ]
+
+
+def _build_solved_block(block: dict, answer: str, answer_option, explanation: str, method: str) -> dict:
+    """Combine a segmented question block with its solution."""
+    options = block.get("options", [])
+    question_body = block.get("question_text", "").strip()
+    
+    # Build formatted question with options for display
+    question_lines = []
+    if question_body:
+        question_lines.append(question_body)
+    if options:
+        for opt in options:
+            question_lines.append(f"{opt['label']}) {opt['text']}")
+    formatted_question = "\n".join(line for line in question_lines if line).strip()
+
+    return {
+        "question_number": block.get("question_number", ""),
+        "question_text": formatted_question or block.get("raw_block", ""),
+        "question_body": question_body,
+        "options": options if options else [],
+        "answer": answer,
+        "answer_option": answer_option,
+        "explanation": explanation,
+        "method": method,
+    }
+
+
+async def _asolve_blocks(question_blocks, answer_key, progress_callback=None, total=1):
+    """Solve question blocks, batching the Gemini fallbacks, and return results in input order."""
+    results = [None] * len(question_blocks)
+    pending = []
+    for idx, block in enumerate(question_blocks):
+        local = _solve_locally(block, answer_key)
+        if local is None:
+            pending.append(idx)
+        else:
+            results[idx] = _build_solved_block(block, *local)
+    done = len(question_blocks) - len(pending)
+    if progress_callback and done:
+        progress_callback(done, total)
+
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_SOLVES)
+
+    async def _run(chunk):
+        async with semaphore:
+            solved = await asyncio.to_thread(_solve_blocks_with_llm, [question_blocks[idx] for idx in chunk])
+        for idx, (answer, explanation, method) in zip(chunk, solved):
+            results[idx] = _build_solved_block(question_blocks[idx], answer, None, explanation, method)
+        return len(chunk)
+
+    chunks = [pending[start : start + SOLVE_BATCH_SIZE] for start in range(0, len(pending), SOLVE_BATCH_SIZE)]
+    for finished in asyncio.as_completed([_run(chunk) for chunk in chunks]):
+        done += await finished
+        if progress_callback:
+            progress_callback(done, total)
+    return results
+
+
+def _pipeline_solve_pages(pages, job_dir: Path, progress_callback=None):
+    """Solve questions from PDF pages."""
+    combined_text = "\n".join([text for page in pages if (text := page.get("text"))])
+    answer_key, key_start = _extract_answer_key_from_text(combined_text)
+    # Questions precede the answer key; index into combined_text rather than copying it
+    questions_end = len(combined_text) if key_start is None else key_start
+    
+    # Use new comprehensive prompt to solve all questions at once
+    char_limit = 50000  # Limit to avoid token limits
+    pdf_text_truncated = combined_text[: min(questions_end, char_limit)]
+    
+    prompt = "".join((_SOLVE_PROMPT_HEAD, pdf_text_truncated, _SOLVE_PROMPT_TAIL))
+    
+    # Try to solve all questions at once with the new prompt
+    structured_error = None
+    try:
+        if progress_callback:
+            progress_callback(0, 1)
+        
+        def _parse_solution(text):
+            # Parse the structured output to extract questions
+            parsed = _parse_structured_solution(text.strip(), answer_key)
+            if not parsed:
+                raise ValueError("No questions found in the structured solution")
+            return parsed
 
+        results = _call_generative_model_cached(prompt, _parse_solution)
+        
         if progress_callback:
-            progress_callback(idx, total)
+            progress_callback(1, 1)
+        
+        solved_file = job_dir / "solved_extracted_data.json"
+        _write_json_file(solved_file, results)
+        return results, solved_file
+    
+    except Exception as exc:
+        # Fallback to original method if new approach fails, keeping the reason
+        # on the results the same way translation errors are kept on items
+        structured_error = str(exc)
+    
+    # Fallback to original segmentation method
+    question_blocks = _segment_questions_from_text(combined_text, questions_end)
+
+    total = len(question_blocks) or 1
+
+    # Blocks are independent and network-bound, so solve them concurrently;
+    # progress is reported from this thread as each one finishes
+    results = asyncio.run(_asolve_blocks(question_blocks, answer_key, progress_callback, total))
+
+    # Answer-key hits still need explanations; request them in batches
+    # rather than one call per question
+    explained = [result for result in results if result["method"] == "answer_key"]
+    explanations = _generate_llm_explanations(
+        [(result["question_text"], result["answer"]) for result in explained]
+    )
+    for result, explanation in zip(explained, explanations):
+        result["explanation"] = explanation
+    if structured_error:
+        for result in results:
+            result["structured_solve_error"] = structured_error
 
     solved_file = job_dir / "solved_extracted_data.json"
-    with solved_file.open("w", encoding="utf-8") as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
+    _write_json_file(solved_file, results)
 
     return results, solved_file
 
@@ -509,7 +923,7 @@ def _parse_structured_solution(solution_text: str, answer_key: dict) -> list:
     results = []
     
     # Split by section separators
-    sections = re.split(r'={10,}', solution_text)
+    sections = _SECTION_SEPARATOR_RE.split(solution_text)
     
     current_section = None
     question_number = None
@@ -520,42 +934,45 @@ def _parse_structured_solution(solution_text: str, answer_key: dict) -> list:
             continue
         
         # Check if this is a section header
-        section_match = re.match(r'SECTION:\s*(.+)', section, re.IGNORECASE)
+        section_match = _SECTION_HEADER_RE.match(section)
         if section_match:
             current_section = section_match.group(1).strip()
             continue
         
         # Parse questions in this section
-        questions = re.split(r'-{10,}', section)
+        questions = _QUESTION_SEPARATOR_RE.split(section)
         
         for question_block in questions:
             question_block = question_block.strip()
             if not question_block:
                 continue
             
-            # Extract question number
-            qnum_match = re.search(r'Question\s+(\d+):', question_block, re.IGNORECASE)
-            if qnum_match:
-                question_number = qnum_match.group(1)
-            
-            # Extract question text
-            qtext_match = re.search(r'Question\s+\d+:\s*(.+?)(?:\n|Options:)', question_block, re.DOTALL | re.IGNORECASE)
-            question_text = qtext_match.group(1).strip() if qtext_match else ""
+            # Extract question number and text in one scan; the number alone
+            # is only looked for when no question text follows it
+            question_match = _SOLVED_QUESTION_RE.search(question_block)
+            if question_match:
+                question_number = question_match.group(1)
+                question_text = question_match.group(2).strip()
+            else:
+                qnum_match = _SOLVED_QNUM_RE.search(question_block)
+                if qnum_match:
+                    question_number = qnum_match.group(1)
+                question_text = ""
             
             # Extract options
-            options_match = re.search(r'Options:\s*(.+?)(?:\n|CORRECT)', question_block, re.DOTALL | re.IGNORECASE)
+            options_match = _SOLVED_OPTIONS_RE.search(question_block)
             options_text = options_match.group(1).strip() if options_match else ""
             options = []
             if options_text:
                 # Parse options like "1) [ans] | 2) [ans]"
-                option_parts = re.split(r'\s*\|\s*', options_text)
+                option_parts = _OPTION_LIST_SEP_RE.split(options_text)
                 for opt_part in option_parts:
-                    opt_match = re.match(r'(\d+)\)\s*(.+)', opt_part.strip())
+                    opt_match = _NUMBERED_OPTION_RE.match(opt_part.strip())
                     if opt_match:
                         options.append({"label": opt_match.group(1), "text": opt_match.group(2).strip()})
             
             # Extract correct answer
-            answer_match = re.search(r'CORRECT ANSWER:\s*(\d+)\)\s*(.+)', question_block, re.IGNORECASE)
+            answer_match = _CORRECT_ANSWER_RE.search(question_block)
             if answer_match:
                 answer_option = answer_match.group(1)
                 answer_text = answer_match.group(2).strip()
@@ -564,7 +981,7 @@ def _parse_structured_solution(solution_text: str, answer_key: dict) -> list:
                 answer_text = ""
             
             # Extract solution/explanation
-            solution_match = re.search(r'SOLUTION:\s*(.+?)(?:\n-{10,}|$)', question_block, re.DOTALL | re.IGNORECASE)
+            solution_match = _SOLUTION_RE.search(question_block)
             explanation = solution_match.group(1).strip() if solution_match else ""
             
             # Use answer key if available
@@ -602,171 +1019,246 @@ def _pipeline_translate_items(items, target_language: str, job_dir: Path, progre
     """Translate solved items to target language."""
     lang_lower = target_language.lower()
     translated_path = job_dir / f"translated_{lang_lower}_auto.json"
-    translated = []
     total = len(items) or 1
-    processed = 0
-    batch_size = 5
-
-    # Build formatted content for translation
-    formatted_content_parts = []
-    for item in items:
-        qnum = item.get("question_number", "")
-        q = item.get("question_body", item.get("question_text", ""))
-        options = item.get("options", [])
-        a = item.get("answer", "")
-        e = item.get("explanation", "")
-        
-        # Build formatted content
-        content_lines = []
-        if qnum:
-            content_lines.append(f"Q{qnum}: {q}")
-        else:
-            content_lines.append(f"Q: {q}")
-        
-        if options:
-            opt_text = " | ".join([f"{opt.get('label', '')}) {opt.get('text', '')}" for opt in options])
-            content_lines.append(f"Options: {opt_text}")
-        
-        if a:
-            content_lines.append(f"✅ Answer: {a}")
-        
-        if e:
-            content_lines.append(f"📝 Solution: {e}")
-        
-        content_lines.append("═══")
-        formatted_content_parts.append("\n".join(content_lines))
-    
-    # Combine all content
-    full_content = "\n\n".join(formatted_content_parts)
-    
-    # Translate in chunks if content is too long
-    char_limit = 40000
-    if len(full_content) <= char_limit:
-        # Translate all at once
-        prompt = f"""
-Translate the following MCQ solutions to {target_language}.
 
-**CRITICAL INSTRUCTIONS:**
-
-1. Maintain ALL formatting: separators (═══), question numbers, structure
+    # Pack formatted items into as few batches as fit (a single call for small
+    # PDFs) and run them several at a time
+    formatted = [_format_translation_item(item) for item in items]
+    sizer = _BatchSizer(_load_batch_size(lang_lower))
+    bins = _pack_items([len(text) for text in formatted], TRANSLATE_BATCH_CHARS, sizer.current)
+    if progress_callback:
+        progress_callback(0, total)
+    translated = asyncio.run(
+        _atranslate_batches(items, formatted, bins, target_language, lang_lower, sizer, progress_callback, total)
+    )
+    _save_batch_size(lang_lower, sizer.current)
+
+    # The file is only needed once the job finishes, so write it while the DOCX is built
+    write_future = _IO_EXECUTOR.submit(_write_json_file, translated_path, translated)
+
+    return translated, translated_path, write_future
+
+
+def _format_translation_item(item: dict) -> str:
+    """Format one item in the Q/Options/Answer/Solution layout the batch parser reads back."""
+    qnum = item.get("question_number", "")
+    q = item.get("question_body", item.get("question_text", ""))
+    options = item.get("options", [])
+    a = item.get("answer", "")
+    e = item.get("explanation", "")
+
+    content_lines = [f"Q{qnum}: {q}" if qnum else f"Q: {q}"]
+    if options:
+        opt_text = " | ".join(f"{opt.get('label', '')}) {opt.get('text', '')}" for opt in options)
+        content_lines.append(f"Options: {opt_text}")
+    if a:
+        content_lines.append(f"✅ Answer: {a}")
+    if e:
+        content_lines.append(f"📝 Solution: {e}")
+    content_lines.append("═══")
+    return "\n".join(content_lines)
+
+
+def _pack_items(lengths: list[int], capacity: int, max_items: int) -> list[list[int]]:
+    """First-fit-decreasing pack of item indices into bins of at most capacity characters.
+
+    Items longer than capacity end up alone in their own bin.
+    """
+    bins = []  # [remaining characters, indices]
+    for idx in sorted(range(len(lengths)), key=lengths.__getitem__, reverse=True):
+        size = lengths[idx] + 2  # "\n\n" between items
+        for entry in bins:
+            if entry[0] >= size and len(entry[1]) < max_items:
+                entry[0] -= size
+                entry[1].append(idx)
+                break
+        else:
+            bins.append([capacity - size, [idx]])
+    return [indices for _, indices in bins]
 
-2. Translate question text, options, and explanations
 
-3. Keep mathematical symbols, numbers, and formulas as-is
+def _translate_batch(batch: list, batch_content: str, target_language: str, lang_lower: str) -> list:
+    """Translate one batch of items, pre-formatted as batch_content, in a single model call."""
+    prompt = _TRANSLATE_PROMPT.format(target_language=target_language, content=batch_content)
+    response = _call_generative_model(prompt, generation_config=_TRANSLATE_GENERATION_CONFIG)
+    return _parse_translated_json(response.text, batch, lang_lower)
 
-4. Keep "Q[Number]:", "Options:", "✅ Answer:", "📝 Solution:" labels
 
-5. Ensure natural, fluent translation in {target_language}
+class _BatchSizer:
+    """Items-per-batch that halves on truncation or failure and grows after clean, fast batches."""
 
-6. Preserve line breaks and spacing
+    def __init__(self, current: int):
+        self.current = min(TRANSLATE_BATCH_MAX_ITEMS, max(TRANSLATE_BATCH_MIN_ITEMS, current))
+        self._ceiling = TRANSLATE_BATCH_MAX_ITEMS  # largest size not yet seen to fail
+        self._streak = 0
 
-**Content to translate:**
+    def adjust(self, success: bool, latency_s: float, items: int) -> None:
+        """Record the outcome of one batch of `items` items."""
+        if not success:
+            self._ceiling = min(self._ceiling, max(TRANSLATE_BATCH_MIN_ITEMS, items - 1))
+            self.current = max(TRANSLATE_BATCH_MIN_ITEMS, min(self.current, items // 2))
+            self._streak = 0
+            return
+        self._streak = self._streak + 1 if latency_s < TRANSLATE_BATCH_TARGET_SECONDS else 0
+        if self._streak >= 3:
+            # Batches are packed up front, so grow one past what actually succeeded
+            self.current = min(self._ceiling, max(self.current, items + 1))
+            self._streak = 0
 
-{full_content}
-
-**Provide ONLY the translated content, maintaining exact structure.**
-"""
-        try:
-            if progress_callback:
-                progress_callback(0, total)
-            response = _call_generative_model(prompt)
-            translated_text = response.text.strip()
-            
-            # Parse translated text back into items
-            translated = _parse_translated_content(translated_text, items, lang_lower)
-            if progress_callback:
-                progress_callback(len(items), total)
-        except Exception as exc:
-            # Fallback to individual item translation
-            translated = _translate_items_individually(items, target_language, lang_lower)
-            if progress_callback:
-                progress_callback(len(items), total)
-    else:
-        # Translate in batches
-        translated = []
-        for batch_start in range(0, len(items), batch_size):
-            batch = items[batch_start : batch_start + batch_size]
-            batch_content_parts = []
-            for item in batch:
-                qnum = item.get('question_number', '')
-                qbody = item.get('question_body', item.get('question_text', ''))
-                options = item.get('options', [])
-                answer = item.get('answer', '')
-                explanation = item.get('explanation', '')
-                
-                # Build options string
-                if options:
-                    opt_parts = []
-                    for opt in options:
-                        opt_label = opt.get('label', '')
-                        opt_text = opt.get('text', '')
-                        opt_parts.append(f"{opt_label}) {opt_text}")
-                    options_str = " | ".join(opt_parts)
-                else:
-                    options_str = ""
-                
-                # Build formatted content for this item
-                item_content = f"Q{qnum}: {qbody}\n"
-                if options_str:
-                    item_content += f"Options: {options_str}\n"
-                if answer:
-                    item_content += f"✅ Answer: {answer}\n"
-                if explanation:
-                    item_content += f"📝 Solution: {explanation}\n"
-                item_content += "═══"
-                batch_content_parts.append(item_content)
-            
-            batch_content = "\n\n".join(batch_content_parts)
-            
-            prompt = f"""
-Translate the following MCQ solutions to {target_language}.
 
-**CRITICAL INSTRUCTIONS:**
+def _load_batch_size(lang_lower: str) -> int:
+    """Return the items-per-batch learned by earlier jobs for this language."""
+    try:
+        return int(json.loads(TRANSLATE_BATCH_SIZES_PATH.read_text(encoding="utf-8"))[lang_lower])
+    except (OSError, ValueError, KeyError, TypeError):
+        return TRANSLATE_BATCH_MAX_ITEMS
 
-1. Maintain ALL formatting: separators (═══), question numbers, structure
 
-2. Translate question text, options, and explanations
+def _save_batch_size(lang_lower: str, size: int) -> None:
+    """Persist the learned items-per-batch so the next job starts from it."""
+    try:
+        sizes = json.loads(TRANSLATE_BATCH_SIZES_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        sizes = {}
+    if not isinstance(sizes, dict) or sizes.get(lang_lower) == size:
+        return
+    sizes[lang_lower] = size
+    tmp_path = TRANSLATE_BATCH_SIZES_PATH.with_suffix(f".{uuid.uuid4().hex}.tmp")
+    try:
+        tmp_path.write_text(json.dumps(sizes), encoding="utf-8")
+        os.replace(tmp_path, TRANSLATE_BATCH_SIZES_PATH)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
 
-3. Keep mathematical symbols, numbers, and formulas as-is
 
-4. Keep "Q[Number]:", "Options:", "✅ Answer:", "📝 Solution:" labels
+async def _atranslate_batch(batch, batch_content, target_language, lang_lower, sizer, semaphore, depth=0):
+    """Translate a batch in a worker thread, retrying failed or dropped items in halves, then per item."""
+    async with semaphore:
+        started = time.monotonic()
+        try:
+            results = await asyncio.to_thread(_translate_batch, batch, batch_content, target_language, lang_lower)
+        except Exception:
+            results = None
+        latency_s = time.monotonic() - started
+    # The parser hands back the original item for blocks missing from a truncated reply
+    missing = (
+        list(range(len(batch)))
+        if results is None
+        else [idx for idx, (result, item) in enumerate(zip(results, batch)) if result is item]
+    )
+    sizer.adjust(success=not missing, latency_s=latency_s, items=len(batch))
+    if not missing:
+        return results
+    # Semaphore released first so the retries can take its slots
+    retry_items = [batch[idx] for idx in missing]
+    if depth < TRANSLATE_SPLIT_RETRIES and len(retry_items) > 1:
+        # Smaller batches usually fit the reply and still translate options, unlike per-item calls
+        half = len(retry_items) // 2
+        halves = await asyncio.gather(
+            *(
+                _atranslate_batch(
+                    part,
+                    "\n\n".join(_format_translation_item(item) for item in part),
+                    target_language,
+                    lang_lower,
+                    sizer,
+                    semaphore,
+                    depth + 1,
+                )
+                for part in (retry_items[:half], retry_items[half:])
+            )
+        )
+        retried = halves[0] + halves[1]
+    else:
+        retried = await _atranslate_items(retry_items, target_language, lang_lower, semaphore)
+    if results is None:
+        return retried
+    for idx, result in zip(missing, retried):
+        results[idx] = result
+    return results
 
-5. Ensure natural, fluent translation in {target_language}
 
-6. Preserve line breaks and spacing
+async def _atranslate_batches(items, formatted, bins, target_language, lang_lower, sizer, progress_callback=None, total=1):
+    """Translate packed bins of items concurrently, scattering results back to input order."""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_TRANSLATIONS)
+    translated = [None] * len(items)
 
-**Content to translate:**
+    async def _run(indices):
+        batch = [items[idx] for idx in indices]
+        batch_content = "\n\n".join(formatted[idx] for idx in indices)
+        if len(batch_content) > TRANSLATE_BATCH_CHARS:
+            # A lone oversized item would be cut off in a batched prompt
+            results = await _atranslate_items(batch, target_language, lang_lower, semaphore)
+        else:
+            results = await _atranslate_batch(batch, batch_content, target_language, lang_lower, sizer, semaphore)
+        for idx, result in zip(indices, results):
+            translated[idx] = result
+        return len(indices)
 
-{batch_content[:char_limit]}
+    processed = 0
+    for finished in asyncio.as_completed([_run(indices) for indices in bins]):
+        processed += await finished
+        if progress_callback:
+            progress_callback(processed, total)
+    return translated
 
-**Provide ONLY the translated content, maintaining exact structure.**
-"""
-            try:
-                response = _call_generative_model(prompt)
-                translated_text = response.text.strip()
-                batch_translated = _parse_translated_content(translated_text, batch, lang_lower)
-                translated.extend(batch_translated)
-            except Exception as exc:
-                # Fallback to individual item translation for this batch
-                batch_translated = _translate_items_individually(batch, target_language, lang_lower)
-                translated.extend(batch_translated)
-            
-            processed += len(batch)
-            if progress_callback:
-                progress_callback(processed, total)
 
-    with translated_path.open("w", encoding="utf-8") as f:
-        json.dump(translated, f, ensure_ascii=False, indent=2)
+def _parse_translated_json(translated_text: str, original_items: list, lang_lower: str) -> list:
+    """Map a JSON-mode translation reply back onto the original items."""
+    try:
+        data = _json_loads(translated_text)
+    except ValueError:
+        # Replies in the plain Q/Options/Answer layout still go through the regex parser;
+        # anything else (e.g. JSON cut off mid-array) is left to the per-item fallback
+        if "═══" in translated_text:
+            return _parse_translated_content(translated_text.strip(), original_items, lang_lower)
+        raise
+    if not isinstance(data, list):
+        raise ValueError("Expected a JSON array of translated items")
+
+    # Per-language keys built once rather than per item
+    text_key = f"question_text_{lang_lower}"
+    body_key = f"question_body_{lang_lower}"
+    options_key = f"options_{lang_lower}"
+    ans_key = f"answer_{lang_lower}"
+    explanation_key = f"explanation_{lang_lower}"
+    translated_items = []
+    for original_item, entry in zip(original_items, data):
+        if not isinstance(entry, dict) or not entry.get("question_text"):
+            translated_items.append(original_item)
+            continue
+        question_text = str(entry["question_text"]).strip()
+        translated_item = {**original_item}
+        translated_item[text_key] = question_text
+        translated_item[body_key] = question_text
+        options = [
+            {"label": str(opt.get("label", "")).strip(), "text": str(opt.get("text", "")).strip()}
+            for opt in entry.get("options") or []
+            if isinstance(opt, dict)
+        ]
+        if options:
+            translated_item[options_key] = options
+        translated_item[ans_key] = str(entry.get("answer") or "").strip()
+        translated_item[explanation_key] = str(entry.get("explanation") or "").strip()
+        translated_items.append(translated_item)
 
-    return translated, translated_path
+    # Items missing from a short reply stay as the originals so the caller can retry them
+    translated_items.extend(original_items[len(translated_items) :])
+    return translated_items
 
 
 def _parse_translated_content(translated_text: str, original_items: list, lang_lower: str) -> list:
     """Parse translated formatted content back into item structure."""
+    # Per-language keys built once rather than per item
+    text_key = f"question_text_{lang_lower}"
+    body_key = f"question_body_{lang_lower}"
+    options_key = f"options_{lang_lower}"
+    ans_key = f"answer_{lang_lower}"
+    explanation_key = f"explanation_{lang_lower}"
     translated_items = []
     
     # Split by separator
-    question_blocks = re.split(r'═{3,}', translated_text)
+    question_blocks = _TRANSLATED_SEPARATOR_RE.split(translated_text)
     
     for idx, (block, original_item) in enumerate(zip(question_blocks, original_items)):
         if not block.strip():
@@ -776,41 +1268,41 @@ def _parse_translated_content(translated_text: str, original_items: list, lang_l
         block = block.strip()
         
         # Extract question number and text
-        qnum_match = re.search(r'Q(\d+):\s*(.+?)(?:\n|Options:)', block, re.DOTALL | re.IGNORECASE)
+        qnum_match = _TRANSLATED_QNUM_RE.search(block)
         if qnum_match:
             question_text = qnum_match.group(2).strip()
         else:
-            q_match = re.search(r'Q:\s*(.+?)(?:\n|Options:)', block, re.DOTALL | re.IGNORECASE)
+            q_match = _TRANSLATED_Q_RE.search(block)
             question_text = q_match.group(1).strip() if q_match else ""
         
         # Extract options
-        options_match = re.search(r'Options:\s*(.+?)(?:\n|✅)', block, re.DOTALL | re.IGNORECASE)
+        options_match = _TRANSLATED_OPTIONS_RE.search(block)
         options = []
         if options_match:
             options_text = options_match.group(1).strip()
             # Parse options like "1) text | 2) text"
-            opt_parts = re.split(r'\s*\|\s*', options_text)
+            opt_parts = _OPTION_LIST_SEP_RE.split(options_text)
             for opt_part in opt_parts:
-                opt_match = re.match(r'(\d+)\)\s*(.+)', opt_part.strip())
+                opt_match = _NUMBERED_OPTION_RE.match(opt_part.strip())
                 if opt_match:
                     options.append({"label": opt_match.group(1), "text": opt_match.group(2).strip()})
         
         # Extract answer
-        answer_match = re.search(r'✅\s*Answer:\s*(.+?)(?:\n|📝)', block, re.DOTALL | re.IGNORECASE)
+        answer_match = _TRANSLATED_ANSWER_RE.search(block)
         answer = answer_match.group(1).strip() if answer_match else ""
         
         # Extract solution/explanation
-        solution_match = re.search(r'📝\s*Solution:\s*(.+?)(?:\n|═|$)', block, re.DOTALL | re.IGNORECASE)
+        solution_match = _TRANSLATED_SOLUTION_RE.search(block)
         explanation = solution_match.group(1).strip() if solution_match else ""
         
         # Build translated item
         translated_item = {**original_item}
-        translated_item[f"question_text_{lang_lower}"] = question_text
-        translated_item[f"question_body_{lang_lower}"] = question_text
+        translated_item[text_key] = question_text
+        translated_item[body_key] = question_text
         if options:
-            translated_item[f"options_{lang_lower}"] = options
-        translated_item[f"answer_{lang_lower}"] = answer
-        translated_item[f"explanation_{lang_lower}"] = explanation
+            translated_item[options_key] = options
+        translated_item[ans_key] = answer
+        translated_item[explanation_key] = explanation
         
         translated_items.append(translated_item)
     
@@ -821,50 +1313,111 @@ def _parse_translated_content(translated_text: str, original_items: list, lang_l
     return translated_items
 
 
-def _translate_items_individually(items: list, target_language: str, lang_lower: str) -> list:
-    """Fallback: Translate items individually."""
-    translated = []
-    for item in items:
-        q = item.get("question_body", item.get("question_text", ""))
-        a = item.get("answer", "")
-        e = item.get("explanation", "")
-        
-        prompt = f"""
-Translate the following solved MCQ into {target_language}.
+def _item_translate_prompt(item: dict, target_language: str, lang_lower: str) -> str:
+    """Build the single-item translation prompt (also the item's cache key)."""
+    return _ITEM_TRANSLATE_PROMPT.format(
+        target_language=target_language,
+        lang_lower=lang_lower,
+        question=item.get("question_body", item.get("question_text", "")),
+        answer=item.get("answer", ""),
+        explanation=item.get("explanation", ""),
+    )
 
-Keep all numbers, symbols, and math expressions unchanged.
 
-Return output strictly as JSON like:
-{{
-  "question_text_{lang_lower}": "...",
-  "answer_{lang_lower}": "...",
-  "explanation_{lang_lower}": "..."
-}}
+def _merge_item_translation(item: dict, parsed, raw_text: str, lang_lower: str) -> dict:
+    """Merge a parsed single-item translation into a copy of the item."""
+    if not parsed:
+        return {**item, f"raw_translation_{lang_lower}": raw_text.strip()}
+    merged = {**item, **parsed}
+    if f"options_{lang_lower}" not in parsed and item.get("options"):
+        merged[f"options_{lang_lower}"] = item.get("options")
+    return merged
 
-Question: {q}
-Answer: {a}
-Explanation: {e}
-"""
+
+def _parse_item_translation(text: str) -> dict:
+    """Parse a single-item translation reply, rejecting anything but a JSON object."""
+    parsed = parse_json_response(text)
+    if not isinstance(parsed, dict):
+        raise ValueError("Item translation reply is not a JSON object")
+    return parsed
+
+
+def _translate_item(item: dict, target_language: str, lang_lower: str) -> dict:
+    """Translate a single item, recording any error on the item."""
+    try:
+        # The prompt is fully determined by the item and language, so repeated
+        # items (within a job or across reruns) are answered from llm_cache
+        parsed, raw_text = _call_generative_model_cached(
+            _item_translate_prompt(item, target_language, lang_lower),
+            lambda text: (_parse_item_translation(text), text),
+        )
+        return _merge_item_translation(item, parsed, raw_text, lang_lower)
+    except Exception as exc:
+        item[f"translation_error_{lang_lower}"] = str(exc)
+        return item
+
+
+def _translate_item_group(items: list, target_language: str, lang_lower: str) -> list:
+    """Translate several items with one JSON-array call, retrying any missing entry on its own."""
+    # Items translated before (singly or in a group) are served from their
+    # per-item cache entry, so only new items go into the group prompt
+    prompts = [_item_translate_prompt(item, target_language, lang_lower) for item in items]
+    results = [None] * len(items)
+    for idx, prompt in enumerate(prompts):
+        cached = llm_cache.get_response(prompt)
+        if cached is not None:
+            try:
+                results[idx] = _merge_item_translation(items[idx], _parse_item_translation(cached), cached, lang_lower)
+            except (ValueError, TypeError):
+                pass
+    missing = [idx for idx, result in enumerate(results) if result is None]
+    if len(missing) > 1:
+        payload = _json_dumps(
+            [
+                {
+                    "question": items[idx].get("question_body", items[idx].get("question_text", "")),
+                    "answer": items[idx].get("answer", ""),
+                    "explanation": items[idx].get("explanation", ""),
+                }
+                for idx in missing
+            ]
+        )
+        prompt = _ITEM_GROUP_TRANSLATE_PROMPT.format(target_language=target_language, payload=payload)
         try:
-            response = _call_generative_model(prompt)
-            parsed = extract_inner_json(response.text.strip())
-            if not parsed:
-                parsed = json.loads(extract_json_block(response.text))
-            if parsed:
-                merged = {**item, **parsed}
-                if f"options_{lang_lower}" not in parsed and item.get("options"):
-                    merged[f"options_{lang_lower}"] = item.get("options")
-            else:
-                merged = {
-                    **item,
-                    f"raw_translation_{lang_lower}": response.text.strip(),
+            response = _call_generative_model(prompt, generation_config=_TRANSLATE_GENERATION_CONFIG)
+            parsed = _json_loads(response.text)
+        except Exception:
+            parsed = None
+        if isinstance(parsed, list):
+            for idx, entry in zip(missing, parsed):
+                if not isinstance(entry, dict) or not entry.get("question_text"):
+                    continue
+                translation = {
+                    f"question_text_{lang_lower}": entry["question_text"],
+                    f"answer_{lang_lower}": entry.get("answer", ""),
+                    f"explanation_{lang_lower}": entry.get("explanation", ""),
                 }
-            translated.append(merged)
-        except Exception as exc:
-            item[f"translation_error_{lang_lower}"] = str(exc)
-            translated.append(item)
-    
-    return translated
+                results[idx] = _merge_item_translation(items[idx], translation, "", lang_lower)
+                llm_cache.set_response(prompts[idx], _json_dumps(translation))
+    for idx, result in enumerate(results):
+        if result is None:
+            results[idx] = _translate_item(items[idx], target_language, lang_lower)
+    return results
+
+
+async def _atranslate_items(items, target_language, lang_lower, semaphore):
+    """Translate items in concurrent groups in worker threads, returning results in input order."""
+    groups = [
+        items[start : start + TRANSLATE_FALLBACK_GROUP_SIZE]
+        for start in range(0, len(items), TRANSLATE_FALLBACK_GROUP_SIZE)
+    ]
+
+    async def _run(group):
+        async with semaphore:
+            return await asyncio.to_thread(_translate_item_group, group, target_language, lang_lower)
+
+    group_results = await asyncio.gather(*(_run(group) for group in groups))
+    return [result for results in group_results for result in results]
 
 
 def _build_solution_docx_text(translated_items, lang_lower: str):
@@ -872,32 +1425,39 @@ def _build_solution_docx_text(translated_items, lang_lower: str):
     ans_label, exp_label, title_label = PIPELINE_LABELS.get(
         lang_lower, PIPELINE_LABELS["telugu"]
     )
-    suffix = f"_{lang_lower}"
+    # Per-language keys built once rather than per item
+    body_key = f"question_body_{lang_lower}"
+    text_key = f"question_text_{lang_lower}"
+    options_key = f"options_{lang_lower}"
+    ans_key = f"answer_{lang_lower}"
+    explanation_key = f"explanation_{lang_lower}"
     lines: list[str] = [f"**{title_label}**", ""]
 
     for idx, item in enumerate(translated_items, start=1):
         question_label = item.get("question_number") or idx
         
         q_body = _clean_text(
-            item.get(f"question_body{suffix}", "") or 
+            item.get(body_key, "") or 
             item.get("question_body", "") or
-            item.get(f"question_text{suffix}", "") or 
+            item.get(text_key, "") or 
             item.get("question_text", "")
         )
         
-        options = item.get(f"options_{lang_lower}", item.get("options", []))
+        options = item.get(options_key, item.get("options", []))
         
-        if not options or len(options) == 0:
-            q_full = _clean_text(item.get(f"question_text{suffix}", "") or item.get("question_text", ""))
-            if q_full and q_full != q_body:
-                option_pattern1 = re.compile(r"(?m)^\s*(\d+)\)\s*(.+?)(?=\n\s*\d+\)|$)", re.MULTILINE)
-                option_matches = list(option_pattern1.finditer(q_full))
-                if not option_matches:
-                    option_pattern2 = re.compile(r"(?m)^\s*(\d+)\.\s*(.+?)(?=\n\s*\d+\.|$)", re.MULTILINE)
-                    option_matches = list(option_pattern2.finditer(q_full))
-                if not option_matches:
-                    option_pattern3 = re.compile(r"(?m)\((\d+)\)\s*(.+?)(?=\((\d+)\)|$)", re.MULTILINE)
-                    option_matches = list(option_pattern3.finditer(q_full))
+        if not options:
+            q_full = _clean_text(item.get(text_key, "") or item.get("question_text", ""))
+            # Every option pattern needs "N)" or "N.", so skip the scans when neither can occur
+            if q_full and q_full != q_body and (")" in q_full or "." in q_full):
+                # Styles stay in priority order (one alternation would mix them on
+                # mixed-style text); each scan runs only if its delimiter occurs
+                option_matches = []
+                if ")" in q_full:
+                    option_matches = list(_LINE_PAREN_OPTION_RE.finditer(q_full))
+                if not option_matches and "." in q_full:
+                    option_matches = list(_LINE_DOT_OPTION_RE.finditer(q_full))
+                if not option_matches and "(" in q_full:
+                    option_matches = list(_BRACKETED_OPTION_RE.finditer(q_full))
                 
                 if option_matches:
                     options = [
@@ -905,25 +1465,35 @@ def _build_solution_docx_text(translated_items, lang_lower: str):
                         for opt in option_matches
                     ]
         
-        ans = _clean_text(item.get(f"answer{suffix}", "") or item.get("answer", ""))
+        ans = _clean_text(item.get(ans_key, "") or item.get("answer", ""))
         answer_option = item.get("answer_option", "")
         
         if not answer_option and ans:
-            option_match = re.search(r"option\s*(\d+)|(\d+)\)", ans, re.IGNORECASE)
+            option_match = _ANSWER_OPTION_RE.search(ans)
             if option_match:
                 answer_option = option_match.group(1) or option_match.group(2)
         
-        # Find the actual answer text from options if answer_option is available
-        actual_answer_text = None
-        if answer_option and options and isinstance(options, list) and len(options) > 0:
+        # Clean each option once and index by label for the answer lookups below
+        option_rows = []
+        label_index = {}  # label -> text of the first option with that label
+        filled_label_index = {}  # label -> first non-empty text with that label
+        if options and isinstance(options, list):
             for opt in options:
                 opt_label = str(opt.get("label", "")).strip()
-                if str(opt_label) == str(answer_option):
-                    actual_answer_text = _clean_text(opt.get("text", "")).strip()
-                    break
+                opt_text = _clean_text(opt.get("text", "")).strip()
+                option_rows.append((opt_label, opt_text))
+                label_index.setdefault(opt_label, opt_text)
+                if opt_text:
+                    filled_label_index.setdefault(opt_label, opt_text)
+        answer_label = str(answer_option)
+
+        # Find the actual answer text from options if answer_option is available
+        actual_answer_text = None
+        if answer_option:
+            actual_answer_text = label_index.get(answer_label)
         
         exp = _clean_text(
-            item.get(f"explanation{suffix}", "") or item.get("explanation", "")
+            item.get(explanation_key, "") or item.get("explanation", "")
         )
 
         if not (q_body or ans or exp):
@@ -936,12 +1506,10 @@ def _build_solution_docx_text(translated_items, lang_lower: str):
             lines.append(q_body)
             lines.append("")
         
-        if options and isinstance(options, list) and len(options) > 0:
-            for opt in options:
-                opt_label = str(opt.get("label", "")).strip()
-                opt_text = _clean_text(opt.get("text", "")).strip()
+        if option_rows:
+            for opt_label, opt_text in option_rows:
                 if opt_text:
-                    if answer_option and str(opt_label) == str(answer_option):
+                    if answer_option and opt_label == answer_label:
                         lines.append(f"  ✓ {opt_label}) {opt_text}")
                     else:
                         lines.append(f"    {opt_label}) {opt_text}")
@@ -955,16 +1523,9 @@ def _build_solution_docx_text(translated_items, lang_lower: str):
             cleaned_ans = ans.replace("Option ", "").replace("option ", "").strip()
             if cleaned_ans and cleaned_ans != ans:
                 # Try to find the option text
-                if options and isinstance(options, list) and len(options) > 0:
-                    for opt in options:
-                        opt_label = str(opt.get("label", "")).strip()
-                        if str(opt_label) == str(cleaned_ans):
-                            actual_answer_text = _clean_text(opt.get("text", "")).strip()
-                            if actual_answer_text:
-                                lines.append(f"{ans_label}: {actual_answer_text}")
-                                break
-                    if not actual_answer_text:
-                        lines.append(f"{ans_label}: {ans}")
+                if option_rows:
+                    actual_answer_text = filled_label_index.get(cleaned_ans)
+                    lines.append(f"{ans_label}: {actual_answer_text or ans}")
                 else:
                     lines.append(f"{ans_label}: {ans}")
             else:
@@ -987,10 +1548,19 @@ def run_solution_generation_pipeline(uploaded_file, target_language: str, progre
     input_pdf = job_dir / uploaded_file.name
     _write_uploaded_file(uploaded_file, input_pdf)
 
+    last_shown = {"label": None, "percent": None}
+
     def _update(label, fraction):
         fraction = min(max(fraction, 0.0), 1.0)
+        # Progress fires per question/batch; skip widget updates that change nothing visible
+        percent = int(fraction * 100)
+        if label == last_shown["label"] and percent == last_shown["percent"]:
+            return
         progress_bar.progress(fraction, text=label)
-        status_placeholder.info(label)
+        if label != last_shown["label"]:
+            status_placeholder.info(label)
+        last_shown["label"] = label
+        last_shown["percent"] = percent
 
     _update("Extracting PDF...", 0.05)
     pages, extracted_json = _pipeline_extract_pdf(input_pdf, job_dir)
@@ -1000,13 +1570,12 @@ def run_solution_generation_pipeline(uploaded_file, target_language: str, progre
 
     solved, solved_json = _pipeline_solve_pages(pages, job_dir, solving_progress)
 
+    translate_label = f"Translating to {target_language}..."
+
     def translate_progress(current, total):
-        _update(
-            f"Translating to {target_language}...",
-            0.5 + (current / (total or 1)) * 0.3,
-        )
+        _update(translate_label, 0.5 + (current / (total or 1)) * 0.3)
 
-    translated, translated_json = _pipeline_translate_items(
+    translated, translated_json, translated_write = _pipeline_translate_items(
         solved, target_language, job_dir, translate_progress
     )
 
@@ -1020,6 +1589,7 @@ def run_solution_generation_pipeline(uploaded_file, target_language: str, progre
         final_docx_path.write_bytes(docx_bytes)
     else:
         final_docx_path = None
+    translated_write.result()  # surfaces any write error before reporting the file
     _update("Pipeline complete!", 1.0)
 
     return {
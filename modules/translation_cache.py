@@ -0,0 +1,79 @@
+"""
+Translation Cache Module - Persistent (text, language) -> translation store
+"""
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from config.settings import TRANSLATION_CACHE_PATH
+
+# Hottest entries kept in-process in front of the SQLite store
+MEMORY_CACHE_SIZE = 4096
+
+_lock = threading.Lock()
+_memory = OrderedDict()
+_connection: sqlite3.Connection | None = None
+
+
+def _get_connection() -> sqlite3.Connection:
+    """Open the SQLite store on first use."""
+    global _connection
+    if _connection is None:
+        _connection = sqlite3.connect(str(TRANSLATION_CACHE_PATH), check_same_thread=False)
+        _connection.execute("PRAGMA journal_mode=WAL")
+        _connection.execute(
+            "CREATE TABLE IF NOT EXISTS translations (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+    return _connection
+
+
+def _make_key(text: str, target_language: str) -> str:
+    """Build the cache key for a (text, language) pair."""
+    return hashlib.blake2b(f"{target_language}\0{text}".encode("utf-8")).hexdigest()
+
+
+def _remember(key: str, value: str):
+    """Store value in the in-process LRU (caller holds the lock)."""
+    _memory[key] = value
+    _memory.move_to_end(key)
+    if len(_memory) > MEMORY_CACHE_SIZE:
+        _memory.popitem(last=False)
+
+
+def get_translation(text: str, target_language: str) -> str | None:
+    """Return the cached translation of text, or None on a miss."""
+    key = _make_key(text, target_language)
+    with _lock:
+        value = _memory.get(key)
+        if value is not None:
+            _memory.move_to_end(key)
+            return value
+        try:
+            row = _get_connection().execute(
+                "SELECT value FROM translations WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        _remember(key, row[0])
+        return row[0]
+
+
+def set_translation(text: str, target_language: str, translation: str):
+    """Cache the translation of text."""
+    if not translation:
+        return
+    key = _make_key(text, target_language)
+    with _lock:
+        _remember(key, translation)
+        try:
+            connection = _get_connection()
+            connection.execute(
+                "INSERT OR REPLACE INTO translations (key, value) VALUES (?, ?)",
+                (key, translation),
+            )
+            connection.commit()
+        except sqlite3.Error:
+            pass  # the cache is best-effort